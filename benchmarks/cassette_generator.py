@@ -0,0 +1,120 @@
+"""Generate synthetic cassettes for benchmarking Betamax.
+
+The cassettes look like what Betamax records: every interaction has a unique
+request URI, the headers a default ``requests.Session`` sends, a JSON
+response body and a few response headers. Bodies can have a fixed size or
+follow a distribution, and may contain secrets for which placeholders are
+defined.
+"""
+import base64
+import json
+import os
+import random
+
+import requests
+
+BASE_URI = 'https://api.example.com'
+
+
+def body_sizes(count, size, distribution='fixed', seed=0):
+    """Yield ``count`` body sizes averaging roughly ``size`` bytes.
+
+    :param str distribution: ``'fixed'``, ``'uniform'`` (between 0 and twice
+        ``size``) or ``'exponential'`` (many small bodies and a few large
+        ones)
+    """
+    rng = random.Random(seed)
+    for _ in range(count):
+        if distribution == 'fixed':
+            yield size
+        elif distribution == 'uniform':
+            yield rng.randint(0, 2 * size)
+        elif distribution == 'exponential':
+            yield int(rng.expovariate(1.0 / size)) if size else 0
+        else:
+            raise ValueError('Unknown distribution {0}'.format(distribution))
+
+
+def placeholders(count):
+    """Return ``count`` placeholders as used by ``use_cassette``."""
+    return [{'placeholder': '<SECRET_{0}>'.format(n),
+             'replace': 'secret-value-{0:04d}'.format(n)}
+            for n in range(count)]
+
+
+def make_body(size, secrets, rng):
+    """Build a JSON document of roughly ``size`` bytes containing secrets."""
+    document = {'secrets': secrets, 'items': []}
+    while len(json.dumps(document)) < size:
+        document['items'].append({
+            'id': rng.randint(0, 10 ** 6),
+            'name': ''.join(rng.choice('abcdefghij') for _ in range(16)),
+        })
+    return json.dumps(document)
+
+
+def uri_for(n):
+    return '{0}/resources/{1}?page=1'.format(BASE_URI, n)
+
+
+def request_headers():
+    """Return the headers a default Session sends to ask for JSON."""
+    headers = requests.utils.default_headers()
+    headers['Accept'] = 'application/json'
+    return dict(headers)
+
+
+def make_interaction(n, body, gzip=False):
+    response_body = {'encoding': 'utf-8', 'string': body}
+    headers = {'Content-Type': ['application/json']}
+    if gzip:
+        import zlib
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        compressed = compressor.compress(body.encode()) + compressor.flush()
+        response_body = {'encoding': 'utf-8',
+                         'base64_string': base64.b64encode(compressed).decode()}
+        headers['Content-Encoding'] = ['gzip']
+
+    sent = request_headers()
+    return {
+        'request': {
+            'body': {'encoding': 'utf-8', 'string': ''},
+            'headers': dict((k, [v]) for (k, v) in sent.items()),
+            'method': 'GET',
+            'uri': uri_for(n),
+        },
+        'response': {
+            'body': response_body,
+            'headers': headers,
+            'status': {'code': 200, 'message': 'OK'},
+            'url': uri_for(n),
+            'elapsed': 0.05,
+        },
+        'recorded_at': '2015-04-18T12:00:00.000000',
+        'duration': 0.08,
+        'time_to_first_byte': 0.05,
+    }
+
+
+def generate(interactions=100, body_size=1024, distribution='fixed',
+             placeholder_count=0, gzip=False, seed=0):
+    """Return the data of a cassette and the placeholders used in it."""
+    rng = random.Random(seed)
+    defined = placeholders(placeholder_count)
+    secrets = [p['placeholder'] for p in defined]
+    sizes = body_sizes(interactions, body_size, distribution, seed)
+    return {
+        'http_interactions': [
+            make_interaction(n, make_body(size, secrets, rng), gzip)
+            for (n, size) in enumerate(sizes)
+        ],
+        'recorded_with': 'betamax/benchmarks',
+    }, defined
+
+
+def write(cassette_library_dir, cassette_name, data):
+    """Write a generated cassette where the JSON serializer will find it."""
+    path = os.path.join(cassette_library_dir, cassette_name + '.json')
+    with open(path, 'w') as fd:
+        json.dump(data, fd)
+    return path
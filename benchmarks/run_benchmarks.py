@@ -0,0 +1,220 @@
+"""Benchmark loading, matching, replaying and saving Betamax cassettes.
+
+Usage::
+
+    python benchmarks/run_benchmarks.py --interactions 1000 --body-size 4096
+
+Each scenario runs against a freshly generated cassette (see
+``cassette_generator.py``) and reports the best time of several runs, the
+throughput in interactions per second and the peak memory allocated while it
+ran.
+"""
+import argparse
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cassette_generator  # noqa: E402
+import requests  # noqa: E402
+
+from betamax import Betamax  # noqa: E402
+from betamax.cassette import Cassette  # noqa: E402
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+CASSETTE_NAME = 'benchmark'
+
+
+class Context(object):
+
+    """Everything the scenarios need to know about the generated cassette."""
+
+    def __init__(self, args, cassette_library_dir, data, placeholders):
+        self.args = args
+        self.cassette_library_dir = cassette_library_dir
+        self.data = data
+        self.placeholders = placeholders
+        self.uris = [cassette_generator.uri_for(n)
+                     for n in range(args.interactions)]
+
+    def cassette(self):
+        cassette = Cassette(
+            CASSETTE_NAME, 'json', record_mode='none',
+            placeholders=self.placeholders,
+            cassette_library_dir=self.cassette_library_dir,
+            decode_compressed_bodies=self.args.decode_compressed_bodies,
+        )
+        cassette.match_options = self.args.match_requests_on
+        return cassette
+
+    def requests(self):
+        headers = cassette_generator.request_headers()
+        return [requests.Request('GET', uri, headers=headers).prepare()
+                for uri in self.uris]
+
+
+def bench_load(ctx):
+    """Cassette() -- read, parse and load every interaction."""
+    def run():
+        ctx.cassette()
+    return run
+
+
+def bench_find_match(ctx):
+    """Cassette.find_match for a request matching each interaction."""
+    cassette = ctx.cassette()
+    prepared = ctx.requests()
+
+    def run():
+        for request in prepared:
+            assert cassette.find_match(request) is not None
+    return run
+
+
+def bench_as_response(ctx):
+    """Interaction.as_response and reading the content of each response."""
+    cassette = ctx.cassette()
+    decode = ctx.args.decode_compressed_bodies
+
+    def run():
+        for interaction in cassette.interactions:
+            interaction.as_response(decode).content
+    return run
+
+
+def bench_save(ctx):
+    """Cassette._save_cassette -- sanitize and serialize every interaction."""
+    cassette = ctx.cassette()
+    cassette.serializer.allow_serialization = True
+
+    def run():
+        cassette._save_cassette()
+    return run
+
+
+def bench_session_get(ctx):
+    """Session.get through BetamaxAdapter for each interaction."""
+    session = requests.Session()
+    recorder = Betamax(session, cassette_library_dir=ctx.cassette_library_dir)
+    recorder.use_cassette(
+        CASSETTE_NAME, record='none', placeholders=ctx.placeholders,
+        match_requests_on=ctx.args.match_requests_on,
+        decode_compressed_bodies=ctx.args.decode_compressed_bodies,
+    )
+    recorder.start()
+    headers = {'Accept': 'application/json'}
+
+    def run():
+        for uri in ctx.uris:
+            session.get(uri, headers=headers).content
+    return run
+
+
+SCENARIOS = [
+    ('load', bench_load),
+    ('find_match', bench_find_match),
+    ('as_response', bench_as_response),
+    ('save', bench_save),
+    ('session_get', bench_session_get),
+]
+
+
+def measure(run, repeat):
+    """Return the best time of ``repeat`` calls and the peak memory used."""
+    times = []
+    peak = None
+    for n in range(repeat):
+        gc.collect()
+        tracing = tracemalloc is not None and n == 0
+        if tracing:
+            tracemalloc.start()
+        start = time.time()
+        run()
+        times.append(time.time() - start)
+        if tracing:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    # The first run is slowed down by tracemalloc, only use it for memory
+    return min(times[1:] or times), peak
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--interactions', type=int, default=500)
+    parser.add_argument('--body-size', type=int, default=2048,
+                        help='average size of response bodies in bytes')
+    parser.add_argument('--distribution', default='fixed',
+                        choices=['fixed', 'uniform', 'exponential'],
+                        help='distribution of the body sizes')
+    parser.add_argument('--placeholders', type=int, default=0,
+                        help='number of placeholders defined and used')
+    parser.add_argument('--gzip', action='store_true',
+                        help='record response bodies gzip-compressed')
+    parser.add_argument('--decode-compressed-bodies', action='store_true')
+    parser.add_argument('--match-requests-on', nargs='+',
+                        default=['method', 'uri'])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scenario', action='append',
+                        choices=[name for (name, _) in SCENARIOS],
+                        help='only run this scenario (may be repeated)')
+    parser.add_argument('--json', action='store_true',
+                        help='print the results as JSON')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    cassette_library_dir = tempfile.mkdtemp()
+    try:
+        data, placeholders = cassette_generator.generate(
+            args.interactions, args.body_size, args.distribution,
+            args.placeholders, args.gzip
+        )
+        path = cassette_generator.write(cassette_library_dir, CASSETTE_NAME,
+                                        data)
+        ctx = Context(args, cassette_library_dir, data, placeholders)
+
+        results = []
+        for (name, scenario) in SCENARIOS:
+            if args.scenario and name not in args.scenario:
+                continue
+            best, peak = measure(scenario(ctx), args.repeat)
+            results.append({
+                'scenario': name,
+                'interactions': args.interactions,
+                'seconds': best,
+                'interactions_per_second': args.interactions / best,
+                'peak_memory': peak,
+            })
+        cassette_size = os.path.getsize(path)
+    finally:
+        shutil.rmtree(cassette_library_dir)
+
+    if args.json:
+        print(json.dumps({'cassette_size': cassette_size,
+                          'results': results}, indent=2))
+        return
+
+    print('{0} interactions, cassette of {1} KiB'.format(
+        args.interactions, cassette_size // 1024))
+    row = '{0:<12} {1:>10} {2:>16} {3:>16}'
+    print(row.format('scenario', 'best (s)', 'interactions/s', 'peak (KiB)'))
+    for r in results:
+        peak = '-' if r['peak_memory'] is None else r['peak_memory'] // 1024
+        print(row.format(r['scenario'], '{0:.4f}'.format(r['seconds']),
+                         '{0:.0f}'.format(r['interactions_per_second']),
+                         peak))
+
+
+if __name__ == '__main__':
+    main()
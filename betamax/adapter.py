@@ -1,7 +1,10 @@
 import os
+import time
 
 from .cassette import Cassette
+from .cassette.util import total_seconds
 from .exceptions import BetamaxError
+from .stats import Stats
 from datetime import datetime, timedelta
 from requests.adapters import BaseAdapter, HTTPAdapter
 
@@ -19,9 +22,17 @@ class BetamaxAdapter(BaseAdapter):
         self.cassette = None
         self.cassette_name = None
         self.old_adapters = kwargs.pop('old_adapters', {})
+        # Prefixes the old adapters were mounted at, longest first
+        self.prefixes = sorted(((p.lower(), a)
+                                for (p, a) in self.old_adapters.items()),
+                               key=lambda item: len(item[0]), reverse=True)
         self.http_adapter = HTTPAdapter(**kwargs)
+        # Record with http_adapter instead of the session's stock adapters
+        # if its connection pools were configured
+        self.record_with_http_adapter = bool(kwargs)
         self.serialize = None
         self.options = {}
+        self.stats = Stats()
 
     def cassette_exists(self):
         if self.cassette_name and os.path.exists(self.cassette_name):
@@ -56,7 +67,17 @@ class BetamaxAdapter(BaseAdapter):
             cassette_name, serialize, placeholders=placeholders,
             record_mode=self.options.get('record'),
             preserve_exact_body_bytes=preserve_exact_body_bytes,
-            cassette_library_dir=self.options.get('cassette_library_dir')
+            replay_order=self.options.get('replay_order'),
+            preserve_chunks=self.options.get('preserve_chunks'),
+            decode_compressed_bodies=self.options.get(
+                'decode_compressed_bodies'
+                ),
+            prune_unused_interactions=self.options.get(
+                'prune_unused_interactions'
+                ),
+            validate_interactions=self.options.get('validate_interactions'),
+            cassette_library_dir=self.options.get('cassette_library_dir'),
+            stats=self.stats
             )
 
         if 'record' in self.options:
@@ -67,8 +88,16 @@ class BetamaxAdapter(BaseAdapter):
         if self.options.get('re_record_interval'):
             re_record_interval = timedelta(self.options['re_record_interval'])
 
+        re_record_scope = self.options.get(
+            're_record_scope', default_options['re_record_scope']
+            )
+
         now = datetime.utcnow()
-        if re_record_interval < (now - self.cassette.earliest_recorded_date):
+        if re_record_scope == 'interaction':
+            # Only re-record the interactions which have expired
+            if re_record_interval < timedelta.max:
+                self.cassette.re_record_before = now - re_record_interval
+        elif re_record_interval < (now - self.cassette.earliest_recorded_date):
             self.cassette.clear()
 
     def send(self, request, stream=False, timeout=None, verify=True,
@@ -78,39 +107,115 @@ class BetamaxAdapter(BaseAdapter):
         if not self.cassette:
             raise BetamaxError('No cassette was specified or found.')
 
+        cassette_path = self.cassette.cassette_path
         if self.cassette.interactions:
             interaction = self.cassette.find_match(request)
+            if interaction:
+                self.stats.record('replay', cassette_path)
+                self.simulate_latency(interaction, stream)
 
-        if not interaction and self.cassette.is_recording():
-            interaction = self.send_and_record(
-                request, stream, timeout, verify, cert, proxies
-                )
+        if not interaction:
+            self.stats.record('miss', cassette_path)
+
+        if not interaction and self.cassette.is_recording(request):
+            try:
+                interaction = self.send_and_record(
+                    request, stream, timeout, verify, cert, proxies
+                    )
+            except Exception:
+                self.cassette.cancel_recording(request)
+                raise
 
         if not interaction:
             raise BetamaxError(unhandled_request_message(request,
                                                          self.cassette))
 
-        resp = interaction.as_response()
+        with self.stats.timer('deserialize', cassette_path):
+            resp = interaction.as_response(
+                self.cassette.decode_compressed_bodies
+                )
         resp.connection = self
+        if 'elapsed' in interaction.json['response']:
+            # Session.send overwrites elapsed with the time this method took
+            # after we return, so put the recorded value back afterwards.
+            resp.recorded_elapsed = resp.elapsed
+            response_hooks = request.hooks.setdefault('response', [])
+            if restore_elapsed not in response_hooks:
+                response_hooks.insert(0, restore_elapsed)
         return resp
 
     def send_and_record(self, request, stream=False, timeout=None,
                         verify=True, cert=None, proxies=None):
         adapter = self.find_adapter(request.url)
-        response = adapter.send(
-            request, stream=True, timeout=timeout, verify=verify,
-            cert=cert, proxies=proxies
+        started_at = datetime.utcnow()
+        with self.stats.timer('upstream', self.cassette.cassette_path):
+            response = adapter.send(
+                request, stream=True, timeout=timeout, verify=verify,
+                cert=cert, proxies=proxies
+                )
+        # Since we're streaming, only the headers have been read so far
+        time_to_first_byte = total_seconds(datetime.utcnow() - started_at)
+        # This is what a Session would have measured as the elapsed time
+        response.elapsed = timedelta(seconds=time_to_first_byte)
+        return self.cassette.save_interaction(
+            response, request, started_at, time_to_first_byte
             )
-        self.cassette.save_interaction(response, request)
-        return self.cassette.interactions[-1]
 
-    def find_adapter(self, url):
-        for (prefix, adapter) in self.old_adapters.items():
+    def simulate_latency(self, interaction, stream=False):
+        """Wait as long as the upstream server took to respond.
 
-            if url.lower().startswith(prefix):
-                return adapter
+        This only waits if the ``replay_latency`` option is set, in which case
+        the recorded time is multiplied by it and capped to
+        ``max_replay_latency`` seconds. When streaming, this waits for the
+        time it took to receive the headers, otherwise for the time it took
+        to receive the whole response. Only the calling thread sleeps.
+        """
+        default_options = Cassette.default_cassette_options
+        factor = self.options.get(
+            'replay_latency', default_options['replay_latency']
+            )
+        if not factor:
+            return
+
+        latency = interaction.duration
+        if stream and interaction.time_to_first_byte is not None:
+            latency = interaction.time_to_first_byte
+        if latency is None:
+            return
+
+        latency *= factor
+        cap = self.options.get(
+            'max_replay_latency', default_options['max_replay_latency']
+            )
+        if cap is not None:
+            latency = min(latency, cap)
+        time.sleep(latency)
 
-        # Unlike in requests, we cannot possibly get this far.
+    def find_adapter(self, url):
+        """Return the adapter to record a request to ``url`` with.
+
+        Like ``Session.get_adapter``, this is the adapter which was mounted at
+        the longest prefix of ``url``, except that ``http_adapter`` replaces
+        the session's ``HTTPAdapter`` if it was given any arguments.
+        """
+        url = url.lower()
+        for (prefix, adapter) in self.prefixes:
+            if url.startswith(prefix):
+                break
+        else:
+            return self.http_adapter
+
+        if self.record_with_http_adapter and type(adapter) is HTTPAdapter:
+            return self.http_adapter
+        return adapter
+
+
+def restore_elapsed(response, *args, **kwargs):
+    """Response hook restoring the elapsed time recorded in the cassette."""
+    recorded_elapsed = getattr(response, 'recorded_elapsed', None)
+    if recorded_elapsed is not None:
+        response.elapsed = recorded_elapsed
+    return response
 
 
 UNHANDLED_REQUEST_EXCEPTION = """A request was made that could not be handled.
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""Replay cassettes from asyncio code without blocking the event loop.
+
+This module needs :mod:`asyncio` (Python 3.4 or later) and is not imported by
+``import betamax``. Its methods return futures rather than being coroutines,
+so that the rest of Betamax keeps working on Python 2:
+
+.. code-block:: python
+
+    from betamax.aio import AsyncCassette
+
+    async def test_get(loop):
+        cassette = await AsyncCassette.open(
+            'github', cassette_library_dir='tests/cassettes', loop=loop
+            )
+        response = await cassette.replay(request)
+        ...
+        await cassette.eject()
+
+"""
+import asyncio
+
+from .cassette import Cassette
+
+
+class AsyncCassette(object):
+
+    """Use a :class:`~betamax.cassette.Cassette` from an event loop.
+
+    Loading and saving the cassette read and write files, so they are run in
+    ``executor``, the loop's default executor if None. Matching requests and
+    building responses only use the interactions already in memory, so they
+    run on the loop itself and return futures which are already done:
+    awaiting them costs no trip through a thread.
+
+    Every method must be called from the loop's thread, which is what keeps
+    the cassette consistent without locks. Do not use the cassette after
+    awaiting :meth:`eject`.
+
+    :param cassette: the loaded cassette
+    :param loop: the event loop, the current one if None
+    :param executor: the ``concurrent.futures`` executor to do file I/O in
+    """
+
+    def __init__(self, cassette, loop=None, executor=None):
+        self.cassette = cassette
+        self.loop = loop or asyncio.get_event_loop()
+        self.executor = executor
+
+    @classmethod
+    def open(cls, cassette_name, serialize_with='json',
+             match_requests_on=None, loop=None, executor=None, **options):
+        """Load a cassette in the executor.
+
+        :param str cassette_name: name of the cassette
+        :param str serialize_with: name of the serializer it was written with
+        :param list match_requests_on: names of the matchers to use, the
+            configured default if None
+        :param options: options of the cassette, e.g.,
+            ``cassette_library_dir`` or ``record_mode``
+        :returns: future resolving to an :class:`AsyncCassette`
+        """
+        loop = loop or asyncio.get_event_loop()
+        if match_requests_on is None:
+            match_requests_on = Cassette.default_cassette_options[
+                'match_requests_on'
+                ]
+
+        def load():
+            cassette = Cassette(cassette_name, serialize_with, **options)
+            cassette.match_options = match_requests_on
+            return cls(cassette, loop, executor)
+
+        return loop.run_in_executor(executor, load)
+
+    def find_match(self, request):
+        """Return a future resolving to the interaction matching ``request``.
+
+        It resolves to None if no interaction matches.
+        """
+        return self._done(self.cassette.find_match, request)
+
+    def as_response(self, interaction):
+        """Return a future resolving to a new Response for ``interaction``."""
+        return self._done(interaction.as_response,
+                          self.cassette.decode_compressed_bodies)
+
+    def replay(self, request):
+        """Return a future resolving to the response recorded for ``request``.
+
+        This finds the matching interaction and builds its response at once.
+        The future resolves to None if no interaction matches.
+        """
+        return self._done(self._replay, request)
+
+    def eject(self):
+        """Save the cassette in the executor.
+
+        :returns: future resolving to None once the cassette is written
+        """
+        return self.loop.run_in_executor(self.executor, self.cassette.eject)
+
+    def _done(self, function, *args):
+        future = asyncio.Future(loop=self.loop)
+        try:
+            future.set_result(function(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    def _replay(self, request):
+        cassette = self.cassette
+        path = cassette.cassette_path
+        interaction = cassette.find_match(request)
+        if interaction is None:
+            cassette.stats.record('miss', path)
+            return None
+
+        cassette.stats.record('replay', path)
+        with cassette.stats.timer('deserialize', path):
+            return interaction.as_response(cassette.decode_compressed_bodies)
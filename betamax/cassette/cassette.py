@@ -1,14 +1,22 @@
 # -*- coding: utf-8 -*-
 from .interaction import Interaction
-from .util import (_option_from, serialize_prepared_request,
-                   serialize_response, timestamp)
+from .util import (_option_from, deserialize_prepared_request,
+                   serialize_prepared_request, serialize_response, timestamp,
+                   total_seconds)
+from .validation import check_structure
+from betamax.exceptions import InvalidCassette
 from betamax.matchers import matcher_registry
-from betamax.serializers import serializer_registry, SerializerProxy
+from betamax.serializers import SerializerProxy
+from betamax.stats import Stats
 from datetime import datetime
 from functools import partial
+from timeit import default_timer
 
 import os.path
 
+#: Stands for an earliest recorded date to recompute when it is next read
+STALE = object()
+
 
 class Cassette(object):
 
@@ -16,8 +24,16 @@ class Cassette(object):
         'record_mode': 'once',
         'match_requests_on': ['method', 'uri'],
         're_record_interval': None,
+        're_record_scope': 'cassette',
         'placeholders': [],
-        'preserve_exact_body_bytes': False
+        'preserve_exact_body_bytes': False,
+        'preserve_chunks': False,
+        'decode_compressed_bodies': False,
+        'prune_unused_interactions': False,
+        'validate_interactions': False,
+        'replay_order': 'first',
+        'replay_latency': None,
+        'max_replay_latency': None,
     }
 
     def __init__(self, cassette_name, serialization_format, **kwargs):
@@ -48,50 +64,107 @@ class Cassette(object):
             'preserve_exact_body_bytes', kwargs, defaults
             )
 
+        # Interactions recorded before this date are re-recorded when matched
+        self.re_record_before = None
+
+        # Determine whether to record the chunks responses are received in
+        self.preserve_chunks = _option_from(
+            'preserve_chunks', kwargs, defaults
+            )
+
+        # Determine whether to decompress each recorded body only once
+        self.decode_compressed_bodies = _option_from(
+            'decode_compressed_bodies', kwargs, defaults
+            )
+
+        # Determine whether to drop the interactions nothing replayed
+        self.prune_unused_interactions = _option_from(
+            'prune_unused_interactions', kwargs, defaults
+            )
+
+        # Determine whether to check the cassette's structure when loading it
+        self.validate_interactions = _option_from(
+            'validate_interactions', kwargs, defaults
+            )
+
+        # Determine which of several matching interactions to replay
+        self.replay_order = _option_from('replay_order', kwargs, defaults)
+
         # Initialize the interactions
         self.interactions = []
 
         # Initialize the match options
         self.match_options = set()
 
+        # Lookup tables of interactions keyed by the match options used
+        self._indexes = {}
+
+        # Position of the next interaction to replay for each set of matches
+        self._cursors = {}
+
+        # Position of each interaction in self.interactions
+        self._positions = {}
+
+        # Requests being re-recorded and the interaction each one replaces
+        self._vacated = []
+
+        # Loaded interactions which have been replayed
+        self._replayed = set()
+
+        # The earliest recorded_at of all the interactions
+        self._earliest_recorded_at = None
+
+        # Number of interactions considered by the last call to find_match
+        self._scanned = 0
+
+        # Where to count what this cassette does
+        self.stats = kwargs.get('stats') or Stats()
+
         self.load_interactions()
         self.serializer.allow_serialization = self.is_recording()
 
     @staticmethod
     def can_be_loaded(cassette_library_dir, cassette_name, serialize_with,
                       record_mode):
-        # If we want to record a cassette we don't care if the file exists
-        # yet
-        recording = False
-        if record_mode in ['once', 'all', 'new_episodes']:
-            recording = True
-
-        serializer = serializer_registry.get(serialize_with)
+        (serializer, cassette_path) = SerializerProxy.locate(
+            serialize_with, cassette_library_dir, cassette_name
+            )
         if not serializer:
             raise ValueError(
                 'Serializer {0} is not registered with Betamax'.format(
                     serialize_with
                     ))
 
-        cassette_path = serializer.generate_cassette_name(
-            cassette_library_dir, cassette_name
-            )
+        # If we want to record a cassette we don't care if the file exists
+        # yet
+        if record_mode in ['once', 'all', 'new_episodes']:
+            return True
+
         # Otherwise if we're only replaying responses, we should probably
         # have the cassette the user expects us to load and raise.
-        return os.path.exists(cassette_path) or recording
+        return os.path.exists(cassette_path)
 
     def clear(self):
         # Clear out the interactions
         self.interactions = []
+        self._indexes = {}
+        self._cursors = {}
+        self._positions = {}
+        self._vacated = []
+        self._replayed = set()
+        self._earliest_recorded_at = None
         # Serialize to the cassette file
         self._save_cassette()
 
     @property
     def earliest_recorded_date(self):
         """The earliest date of all of the interactions this cassette."""
-        if self.interactions:
-            i = sorted(self.interactions, key=lambda i: i.recorded_at)[0]
-            return i.recorded_at
+        if self._earliest_recorded_at is STALE:
+            self._earliest_recorded_at = min(
+                i.recorded_at for i in self.interactions
+            )
+        if self._earliest_recorded_at is not None:
+            return self._earliest_recorded_at
         return datetime.now()
 
     def eject(self):
@@ -103,76 +176,377 @@ class Cassette(object):
         This uses all of the matchers selected via configuration or
         ``use_cassette`` and passes in the request currently in progress.
 
+        When recording all interactions, or if the match was recorded before
+        ``re_record_before``, the match is not returned. Instead the next
+        interaction saved for ``request`` replaces it in place.
+
+        If several interactions match, the first one recorded is returned
+        unless ``replay_order`` is ``'sequential'`` or ``'cycle'``. In those
+        cases each call returns the next matching interaction in the order
+        they were recorded and, once all of them have been replayed, either
+        keeps returning the last one or starts over with the first one.
+
         :param request: ``requests.PreparedRequest``
         :returns: :class:`Interaction <Interaction>`
         """
-        opts = self.match_options
-        # Curry those matchers
-        matchers = [partial(matcher_registry[o].match, request) for o in opts]
-
-        for i in self.interactions:
-            if i.match(matchers):  # If the interaction matches everything
-                if self.record_mode == 'all':
-                    # If we're recording everything and there's a matching
-                    # interaction we want to overwrite it, so we remove it.
-                    self.interactions.remove(i)
-                    break
-                return i
-
-        # No matches. So sad.
-        return None
+        start = default_timer()
+        try:
+            return self._find_match(request)
+        finally:
+            self.stats.record('match', self.cassette_path,
+                              duration=default_timer() - start)
+            self.stats.record('candidates', self.cassette_path,
+                              count=self._scanned)
 
     def is_empty(self):
         """Determine if the cassette was empty when loaded."""
         return not self.serialized
 
-    def is_recording(self):
-        """Return whether the cassette is recording."""
+    def is_recording(self, request=None):
+        """Return whether the cassette is recording.
+
+        :param request: the request which no interaction matched, if any.
+            With the ``'once'`` record mode, a cassette which was not empty
+            only records requests whose expired interaction
+            :meth:`find_match` vacated.
+        """
         values = {
             'none': False,
-            'once': self.is_empty(),
+            'once': self.is_empty() or self._is_vacated_for(request),
         }
         return values.get(self.record_mode, True)
 
     def load_interactions(self):
-        if self.serialized is None:
-            self.serialized = self.serializer.deserialize()
-
-        interactions = self.serialized.get('http_interactions', [])
-        self.interactions = [Interaction(i) for i in interactions]
+        with self.stats.timer('load', self.cassette_path):
+            self._load_interactions()
 
-        for i in self.interactions:
-            i.replace_all(self.placeholders, ('placeholder', 'replace'))
-            i.deserialize()  # this needs to happen *after* replace_all
+    def prune(self):
+        """Drop the loaded interactions which were never replayed.
 
-    def sanitize_interactions(self):
-        for i in self.interactions:
-            i.replace_all(self.placeholders)
+        Interactions recorded since the cassette was loaded are kept. If no
+        interaction was replayed or recorded at all, nothing is dropped, so
+        that a test which failed before making any request does not empty
+        its cassette.
 
-    def save_interaction(self, response, request):
-        interaction = self.serialize_interaction(response, request)
-        self.interactions.append(Interaction(interaction, response))
+        :returns: the number of interactions dropped
+        """
+        used = [i for i in self.interactions
+                if i in self._replayed or i.orig_response is not None]
+        if not used:
+            return 0
+
+        pruned = len(self.interactions) - len(used)
+        if pruned:
+            vacated = self._vacated
+            self.interactions = used
+            self._indexes = {}
+            self._cursors = {}
+            self._positions = dict((i, n) for (n, i) in enumerate(used))
+            self._vacated = [(r, i) for (r, i) in vacated
+                             if i in self._positions]
+            self._earliest_recorded_at = min(i.recorded_at for i in used)
+            self.serializer.allow_serialization = True
+            self.stats.record('pruned', self.cassette_path, count=pruned)
+        return pruned
 
-    def serialize_interaction(self, response, request):
-        return {
+    def sanitize_interactions(self):
+        with self.stats.timer('sanitize', self.cassette_path):
+            for i in self.interactions:
+                i.replace_all(self.placeholders)
+
+    def save_interaction(self, response, request, started_at=None,
+                         time_to_first_byte=None):
+        with self.stats.timer('record', self.cassette_path):
+            serialized = self.serialize_interaction(
+                response, request, started_at, time_to_first_byte
+                )
+        return self.add_interaction(serialized, response, request)
+
+    def add_interaction(self, serialized, response=None, request=None):
+        """Add an interaction returned by :meth:`serialize_interaction`.
+
+        Serializing reads the whole response, so callers recording from
+        several threads can serialize concurrently and only add the
+        interactions one at a time.
+
+        :param dict serialized: the serialized interaction
+        :param response: the ``requests.Response`` it was serialized from
+        :param request: the request it was made for, so that it replaces the
+            interaction :meth:`find_match` vacated for that request, if any
+        """
+        interaction = Interaction(serialized, response)
+
+        vacated = self._pop_vacated(request)
+        if vacated is None:
+            self._positions[interaction] = len(self.interactions)
+            self.interactions.append(interaction)
+        else:
+            position = self._positions.pop(vacated)
+            self._positions[interaction] = position
+            self.interactions[position] = interaction
+
+        earliest = self._earliest_recorded_at
+        if earliest is STALE:
+            pass
+        elif vacated is not None and vacated.recorded_at == earliest:
+            # Replacing the interactions in the order they were recorded
+            # would otherwise scan them all for each one
+            earliest = STALE
+        elif earliest is None or interaction.recorded_at < earliest:
+            earliest = interaction.recorded_at
+        self._earliest_recorded_at = earliest
+
+        for (opts, index) in list(self._indexes.items()):
+            key = self._interaction_key(opts, interaction)
+            if index is None or key is None:
+                self._indexes[opts] = None
+            elif vacated is None:
+                index.setdefault(key, []).append(interaction)
+            else:
+                self._insert(index.setdefault(key, []), interaction)
+
+        return interaction
+
+    def cancel_recording(self, request):
+        """Replay again what :meth:`find_match` vacated for ``request``.
+
+        Call this when recording ``request`` failed, so that the interaction
+        it was to replace is neither lost nor replaced by another request.
+
+        :param request: the request which could not be recorded
+        """
+        interaction = self._pop_vacated(request)
+        while interaction is not None:
+            for (opts, index) in self._indexes.items():
+                if index is not None:
+                    key = self._interaction_key(opts, interaction)
+                    self._insert(index.setdefault(key, []), interaction)
+            interaction = self._pop_vacated(request)
+
+    def serialize_interaction(self, response, request, started_at=None,
+                              time_to_first_byte=None):
+        """Serialize a response and the request it was made for.
+
+        :param datetime started_at: when the request was sent, in UTC. If
+            given, it is used as the recording date and the time it took to
+            receive the whole response is stored as ``duration``.
+        :param float time_to_first_byte: how many seconds it took to receive
+            the response's headers
+        """
+        serialized = {
             'request': serialize_prepared_request(
                 request,
                 self.preserve_exact_body_bytes
                 ),
             'response': serialize_response(
                 response,
-                self.preserve_exact_body_bytes
+                self.preserve_exact_body_bytes,
+                self.preserve_chunks
                 ),
-            'recorded_at': timestamp(),
+            'recorded_at': timestamp(started_at),
         }
+        if started_at is not None:
+            # The body has been read by now
+            serialized['duration'] = total_seconds(
+                datetime.utcnow() - started_at
+                )
+        if time_to_first_byte is not None:
+            serialized['time_to_first_byte'] = time_to_first_byte
+        return serialized
 
     # Private methods
+    def _find_match(self, request):
+        opts = tuple(self.match_options)
+        (key, candidates) = self._find_candidates(opts, request)
+
+        if self.record_mode == 'all' or self.replay_order == 'first':
+            match = next(iter(candidates), None)
+        else:
+            candidates = list(candidates)
+            match = None
+            if candidates:
+                if key is None:
+                    key = id(candidates[0])
+                match = self._replay_next((opts, key), candidates)
+
+        if match is None:
+            # No matches. So sad.
+            return None
+
+        if self.record_mode == 'all' or self._is_stale(match):
+            # If we're recording everything or the interaction has expired,
+            # we want to overwrite it, so we vacate it.
+            self._vacate(match, request)
+            return None
+
+        if match not in self._replayed and match.orig_response is None:
+            # This was loaded from the cassette, not recorded just now
+            self._replayed.add(match)
+            self.stats.record_use(self.cassette_path, self._positions[match])
+        return match
+
+    def _find_candidates(self, opts, request):
+        """Return the key of the request and the interactions matching it.
+
+        The key is None if the matchers in ``opts`` cannot be indexed, in
+        which case the interactions are found lazily by calling each matcher.
+        """
+        index = self._index_for(opts)
+        key = self._key_for(opts, request)
+
+        if index is not None and key is not None:
+            candidates = index.get(key, [])
+            self._scanned = len(candidates)
+            return (key, candidates)
+
+        # Curry those matchers
+        matchers = [partial(matcher_registry[o].match, request) for o in opts]
+        self._scanned = 0
+        return (None, self._scan(matchers))
+
+    def _index_for(self, opts):
+        """Return the lookup table for ``opts``, building it if necessary.
+
+        The table maps the combined key of every matcher to the recorded
+        interactions having that key, in the order they were recorded. If any
+        of the matchers cannot produce keys, this returns None.
+        """
+        if opts in self._indexes:
+            return self._indexes[opts]
+
+        index = {}
+        vacated = self._vacated_interactions()
+        for i in self.interactions:
+            if i in vacated:
+                continue
+            key = self._interaction_key(opts, i)
+            if key is None:
+                index = None
+                break
+            index.setdefault(key, []).append(i)
+
+        self._indexes[opts] = index
+        return index
+
+    def _interaction_key(self, opts, interaction):
+        request = deserialize_prepared_request(interaction.json['request'])
+        return self._key_for(opts, request)
+
+    @staticmethod
+    def _key_for(opts, request):
+        keys = []
+        for o in opts:
+            matcher = matcher_registry[o]
+            indexable = getattr(matcher, 'indexable', None)
+            key = matcher.key(request) if indexable and indexable() else None
+            if key is None:
+                return None
+            keys.append(key)
+        return tuple(keys)
+
+    def _load_interactions(self):
+        if self.serialized is None:
+            self.serialized = self.serializer.deserialize()
+            if self.validate_interactions and self.serialized:
+                problems = check_structure(self.serialized)
+                if problems:
+                    raise InvalidCassette(self.cassette_path, problems)
+
+        interactions = self.serialized.get('http_interactions', [])
+        self.interactions = [Interaction(i) for i in interactions]
+        self._indexes = {}
+        self._cursors = {}
+        self._positions = dict(
+            (i, n) for (n, i) in enumerate(self.interactions)
+        )
+        self._vacated = []
+        self._replayed = set()
+        self.stats.record('loaded', self.cassette_path,
+                          count=len(self.interactions))
+
+        for i in self.interactions:
+            # Responses are deserialized lazily, after this has happened
+            i.replace_all(self.placeholders, ('placeholder', 'replace'))
+
+        self._earliest_recorded_at = None
+        if self.interactions:
+            self._earliest_recorded_at = min(
+                i.recorded_at for i in self.interactions
+            )
+
+    def _insert(self, interactions, interaction):
+        # Keep the interactions in the order they were recorded
+        position = self._positions[interaction]
+        at = len([i for i in interactions if self._positions[i] < position])
+        interactions.insert(at, interaction)
+
+    def _is_stale(self, interaction):
+        return (self.re_record_before is not None and
+                self.record_mode != 'none' and
+                interaction.recorded_at < self.re_record_before)
+
+    def _is_vacated_for(self, request):
+        return any(r is request for (r, _) in self._vacated)
+
+    def _replay_next(self, cursor, candidates):
+        position = self._cursors.get(cursor, 0)
+        if self.replay_order == 'cycle':
+            position %= len(candidates)
+        else:
+            position = min(position, len(candidates) - 1)
+        self._cursors[cursor] = position + 1
+        return candidates[position]
+
+    def _pop_vacated(self, request):
+        """Return the first interaction vacated for ``request``, if any."""
+        for (n, (vacated_for, interaction)) in enumerate(self._vacated):
+            if vacated_for is request:
+                del self._vacated[n]
+                return interaction
+        return None
+
+    def _scan(self, matchers):
+        vacated = self._vacated_interactions()
+        for i in self.interactions:
+            self._scanned += 1
+            if i not in vacated and i.match(matchers):
+                yield i
+
+    def _vacate(self, interaction, request):
+        """Stop replaying ``interaction`` until ``request`` is re-recorded.
+
+        The interaction keeps its place in ``self.interactions`` so that the
+        new recording can take it without shifting every other interaction.
+        It is left out when the cassette is saved if nothing replaces it.
+        """
+        for (opts, index) in self._indexes.items():
+            if index is not None:
+                index[self._interaction_key(opts, interaction)].remove(
+                    interaction
+                    )
+        self._vacated.append((request, interaction))
+        self.serializer.allow_serialization = True
+
+    def _vacated_interactions(self):
+        return set(i for (_, i) in self._vacated)
+
     def _save_cassette(self):
+        with self.stats.timer('save', self.cassette_path):
+            self._write_cassette()
+
+    def _write_cassette(self):
         from .. import __version__
+        if self.prune_unused_interactions:
+            self.prune()
+        if not self.serializer.allow_serialization:
+            # Nothing will be written, so there is nothing to sanitize
+            return
         self.sanitize_interactions()
 
+        vacated = self._vacated_interactions()
         cassette_data = {
-            'http_interactions': [i.json for i in self.interactions],
+            'http_interactions': [i.json for i in self.interactions
+                                  if i not in vacated],
             'recorded_with': 'betamax/{0}'.format(__version__)
         }
         self.serializer.serialize(cassette_data)
@@ -1,7 +1,6 @@
-from .util import (deserialize_response, deserialize_prepared_request,
-                   from_list)
+from .util import (decompress_body, deserialize_response,
+                   deserialize_prepared_request, from_list, parse_timestamp)
 from requests.cookies import extract_cookies_to_jar
-from datetime import datetime
 
 
 class Interaction(object):
@@ -22,24 +21,42 @@ class Interaction(object):
     """
 
     def __init__(self, interaction, response=None):
-        self.recorded_at = None
         self.json = interaction
         self.orig_response = response
-        self.deserialize()
-
-    def as_response(self):
-        """Return the Interaction as a Response object."""
-        return self.recorded_response
-
-    def deserialize(self):
+        self.recorded_at = parse_timestamp(self.json['recorded_at'])
+        # Older cassettes do not have timings
+        self.duration = self.json.get('duration')
+        self.time_to_first_byte = self.json.get('time_to_first_byte')
+        # The Response is only built the first time it is needed
+        self.recorded_response = None
+        # Decompressed body of the response, see as_response
+        self.decoded_body = None
+
+    def as_response(self, decode_content=False):
+        """Return the Interaction as a new Response object.
+
+        Each call builds a new Response so that a response whose body was
+        streamed can be replayed again.
+
+        :param bool decode_content: If the body of the response is compressed,
+            decompress it the first time and serve the decompressed body to
+            every response built afterwards.
+        """
+        return self.deserialize(decode_content)
+
+    def deserialize(self, decode_content=False):
         """Turn a serialized interaction into a Response."""
-        r = deserialize_response(self.json['response'])
+        if decode_content and self.decoded_body is None:
+            self.decoded_body = decompress_body(self.json['response'])
+        decoded_body = self.decoded_body if decode_content else None
+
+        r = deserialize_response(self.json['response'], decoded_body)
         r.request = deserialize_prepared_request(self.json['request'])
-        extract_cookies_to_jar(r.cookies, r.request, r.raw)
-        self.recorded_at = datetime.strptime(
-            self.json['recorded_at'], '%Y-%m-%dT%H:%M:%S'
-        )
+        # Most responses set no cookies, so avoid going through cookielib
+        if 'set-cookie' in r.headers or 'set-cookie2' in r.headers:
+            extract_cookies_to_jar(r.cookies, r.request, r.raw)
         self.recorded_response = r
+        return r
 
     def match(self, matchers):
         """Return whether this interaction is a match."""
@@ -1,27 +1,36 @@
-from email import parser, message
-import sys
-
-
 class MockHTTPResponse(object):
     def __init__(self, headers):
-        from .util import coerce_content
+        self.headers = headers
+        self._msg = None
 
-        h = ["%s: %s" % (k, v) for k in headers for v in headers.getlist(k)]
-        h = map(coerce_content, h)
-        h = '\r\n'.join(h)
-        if sys.version_info < (2, 7):
-            h = h.encode()
-        p = parser.Parser(EmailMessage)
-        # Thanks to Python 3, we have to use the slightly more awful API below
-        # mimetools was deprecated so we have to use email.message.Message
-        # which takes no arguments in its initializer.
-        self.msg = p.parsestr(h)
-        self.msg.set_payload(h)
+    @property
+    def msg(self):
+        # This is only used by requests to extract cookies, so the headers
+        # are only wrapped when a response actually has cookies to extract.
+        if self._msg is None:
+            self._msg = MockHeaders(self.headers)
+        return self._msg
 
     def isclosed(self):
         return False
 
 
-class EmailMessage(message.Message):
-    def getheaders(self, value, *args):
-        return self.get_all(value, [])
+class MockHeaders(object):
+
+    """Expose recorded headers the way ``cookielib`` expects to read them.
+
+    This provides the subset of ``httplib.HTTPMessage`` (on Python 2) and
+    ``email.message.Message`` (on Python 3) that cookie extraction uses.
+    """
+
+    def __init__(self, headers):
+        self.headers = headers
+
+    def get_all(self, name, default=None):
+        from .util import coerce_content
+
+        values = [coerce_content(v) for v in self.headers.getlist(name)]
+        return values or default
+
+    def getheaders(self, name, *args):
+        return self.get_all(name, [])
@@ -1,5 +1,5 @@
 from .mock_response import MockHTTPResponse
-from datetime import datetime
+from datetime import datetime, timedelta
 from requests.models import PreparedRequest, Response
 from requests.packages.urllib3 import HTTPResponse
 from requests.packages.urllib3._collections import HTTPHeaderDict
@@ -9,6 +9,8 @@ from requests.cookies import RequestsCookieJar
 
 import base64
 import io
+import re
+import zlib
 
 
 def coerce_content(content, encoding=None):
@@ -29,7 +31,162 @@ def from_list(value):
     return value
 
 
-def add_body(r, preserve_exact_body_bytes, body_dict):
+def body_bytes(serialized_body):
+    """Return the whole of a recorded body as bytes.
+
+    This ignores the chunks the body was received in. Bodies recorded by
+    older versions of Betamax are plain strings.
+    """
+    if not isinstance(serialized_body, dict):
+        return serialized_body.encode('utf-8')
+    if 'base64_string' in serialized_body:
+        return base64.b64decode(serialized_body['base64_string'].encode())
+    body = serialized_body.get('string', '')
+    if hasattr(body, 'encode'):
+        body = body.encode(serialized_body.get('encoding') or 'utf-8')
+    return body
+
+
+class RecordedBody(object):
+
+    """A file-like object replaying a recorded body.
+
+    The body is only decoded the first time it is read. If the sizes of the
+    chunks the body was received in were recorded, reads of a given size
+    never cross the boundary of a chunk, so consumers see the body arrive as
+    it originally did. Reading without a size returns the rest of the body.
+    """
+
+    def __init__(self, serialized_body):
+        self.serialized_body = serialized_body
+        self.body = None
+        self.position = 0
+        self.boundaries = []
+        offset = 0
+        for size in serialized_body.get('chunks') or []:
+            offset += size
+            self.boundaries.append(offset)
+        self.boundaries.reverse()
+        self.closed = False
+
+    def read(self, amt=None):
+        if self.body is None:
+            self.body = body_bytes(self.serialized_body)
+
+        end = len(self.body)
+        # Drop the boundaries we have already read past
+        while self.boundaries and self.boundaries[-1] <= self.position:
+            self.boundaries.pop()
+        if amt is not None and amt >= 0:
+            end = min(end, self.position + amt)
+            if self.boundaries:
+                end = min(end, self.boundaries[-1])
+
+        data = self.body[self.position:end]
+        self.position = end
+        return data
+
+    read1 = read
+
+    def close(self):
+        self.closed = True
+
+
+class RecordedHTTPResponse(HTTPResponse):
+
+    """An ``HTTPResponse`` streaming a body in the chunks it was recorded in.
+
+    urllib3 2 fills every read up to the size asked for, which would merge
+    the chunks of a :class:`RecordedBody` back together.
+    """
+
+    def stream(self, amt=2 ** 16, decode_content=None):
+        body = self._fp
+        if not getattr(body, 'boundaries', None):
+            for data in super(RecordedHTTPResponse, self).stream(
+                    amt, decode_content):
+                yield data
+            return
+
+        if decode_content is None:
+            decode_content = self.decode_content
+        self._init_decoder()
+        while True:
+            data = body.read(amt)
+            if not data:
+                break
+            data = self._decode(data, decode_content, False)
+            if data:
+                yield data
+        if decode_content:
+            data = self._flush_decoder()
+            if data:
+                yield data
+
+
+class Sanitizer(object):
+
+    """Replace the values of many placeholders in a single pass.
+
+    The values are compiled into one regular expression, longest first, so
+    that each string is scanned once however many placeholders there are.
+
+    :param list placeholders: dictionaries with ``'placeholder'`` and
+        ``'replace'`` keys, as passed to ``use_cassette``
+    """
+
+    def __init__(self, placeholders):
+        self.placeholders = dict(
+            (p['replace'], p['placeholder']) for p in placeholders
+            if p['replace']
+        )
+        values = sorted(self.placeholders, key=len, reverse=True)
+        self.pattern = None
+        if values:
+            self.pattern = re.compile('|'.join(re.escape(v) for v in values))
+        #: Number of values replaced so far
+        self.replacements = 0
+
+    def sanitize(self, text):
+        """Return ``text`` with every value replaced by its placeholder."""
+        if self.pattern is None or not text:
+            return text
+        (text, count) = self.pattern.subn(self._placeholder, text)
+        self.replacements += count
+        return text
+
+    def _placeholder(self, match):
+        return self.placeholders[match.group(0)]
+
+    def sanitize_interaction(self, interaction):
+        """Sanitize the headers, bodies and URIs of a serialized interaction.
+
+        Like :meth:`Interaction.replace <betamax.cassette.Interaction.replace>`
+        this leaves base64 encoded bodies alone.
+        """
+        for obj in ('request', 'response'):
+            serialized = interaction[obj]
+            headers = serialized['headers']
+            for (name, value) in headers.items():
+                if isinstance(value, list):
+                    headers[name] = [self.sanitize(v) for v in value]
+                else:
+                    headers[name] = self.sanitize(value)
+
+            body = serialized['body']
+            if isinstance(body, dict):
+                if 'string' in body:
+                    body['string'] = self.sanitize(body['string'])
+            else:
+                serialized['body'] = self.sanitize(body)
+
+        for (obj, key) in (('request', 'uri'), ('response', 'url')):
+            if key in interaction[obj]:
+                interaction[obj][key] = self.sanitize(interaction[obj][key])
+        return interaction
+
+
+def add_body(r, preserve_exact_body_bytes, body_dict, preserve_chunks=False):
     """Simple function which takes a response or request and coerces the body.
 
     This function adds either ``'string'`` or ``'base64_string'`` to
@@ -42,9 +199,16 @@ def add_body(r, preserve_exact_body_bytes, body_dict):
     :param preserve_exact_body_bytes bool: Either True or False.
     :param body_dict dict: A dictionary already containing the encoding to be
         used.
+    :param preserve_chunks bool: Whether to add the sizes of the chunks of a
+        response sent with chunked transfer encoding as ``'chunks'``.
     """
     body = getattr(r, 'raw', getattr(r, 'body', None))
-    if hasattr(body, 'read'):
+    if (preserve_chunks and getattr(body, 'chunked', False) and
+            hasattr(body, 'read_chunked')):
+        chunks = [c for c in body.read_chunked() if c]
+        body_dict['chunks'] = [len(c) for c in chunks]
+        body = b''.join(chunks)
+    elif hasattr(body, 'read'):
         body = body.read()
 
     if not body:
@@ -88,23 +252,34 @@ def deserialize_prepared_request(serialized):
     return p
 
 
-def serialize_response(response, preserve_exact_body_bytes):
+def serialize_response(response, preserve_exact_body_bytes,
+                       preserve_chunks=False):
     body = {'encoding': response.encoding}
-    add_body(response, preserve_exact_body_bytes, body)
+    add_body(response, preserve_exact_body_bytes, body, preserve_chunks)
     header_map = response.raw.headers
     headers = {}
     for header_name in header_map.keys():
         headers[header_name] = header_map.getlist(header_name)
 
-    return {
+    serialized = {
         'body': body,
         'headers': headers,
         'status': {'code': response.status_code, 'message': response.reason},
         'url': response.url,
     }
+    # Responses which were not sent through a Session have no elapsed time
+    if response.elapsed:
+        serialized['elapsed'] = total_seconds(response.elapsed)
+    return serialized
 
 
-def deserialize_response(serialized):
+def deserialize_response(serialized, decoded_body=None):
+    """Turn a serialized response into a Response.
+
+    :param bytes decoded_body: the body of the response already decompressed
+        with :func:`decompress_body`. If given, it is served as is instead of
+        letting urllib3 decompress the recorded body.
+    """
     r = Response()
     r.encoding = serialized['body']['encoding']
     header_dict = HTTPHeaderDict()
@@ -124,36 +299,78 @@ def deserialize_response(serialized):
     else:
         r.status_code = serialized['status_code']
         r.reason = _codes[r.status_code][0].upper()
-    add_urllib3_response(serialized, r, header_dict)
+    if 'elapsed' in serialized:
+        r.elapsed = timedelta(seconds=serialized['elapsed'])
+    add_urllib3_response(serialized, r, header_dict, decoded_body)
     return r
 
 
-def add_urllib3_response(serialized, response, headers):
-    if 'base64_string' in serialized['body']:
-        body = io.BytesIO(
-            base64.b64decode(serialized['body']['base64_string'].encode())
-        )
-    else:
-        body = body_io(**serialized['body'])
+def add_urllib3_response(serialized, response, headers, decoded_body=None):
+    body = RecordedBody(serialized['body'])
+    raw_headers = headers
+    if decoded_body is not None:
+        # Only urllib3 sees these headers, response.headers stay as recorded
+        body = io.BytesIO(decoded_body)
+        raw_headers = headers.copy()
+        raw_headers.pop('Content-Encoding', None)
+        raw_headers['Content-Length'] = str(len(decoded_body))
 
-    h = HTTPResponse(
+    h = RecordedHTTPResponse(
         body,
         status=response.status_code,
-        headers=headers,
+        headers=raw_headers,
         preload_content=False,
         original_response=MockHTTPResponse(headers)
     )
     response.raw = h
 
 
-def timestamp():
-    stamp = datetime.utcnow().isoformat()
-    try:
-        i = stamp.rindex('.')
-    except ValueError:
-        return stamp
-    else:
-        return stamp[:i]
+def decompress_body(serialized):
+    """Decompress the body of a serialized response.
+
+    :returns: the decompressed body, or None if the response does not use a
+        gzip or deflate Content-Encoding
+    """
+    encoding = ''
+    for (name, value) in serialized['headers'].items():
+        if name.lower() == 'content-encoding':
+            encoding = from_list(value).strip().lower()
+
+    if encoding not in ('gzip', 'x-gzip', 'deflate'):
+        return None
+
+    body = body_bytes(serialized['body'])
+    if encoding == 'deflate':
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            # Some servers send raw deflate streams without a zlib header
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    return zlib.decompress(body, 16 + zlib.MAX_WBITS)
+
+
+def timestamp(when=None):
+    return (when or datetime.utcnow()).isoformat()
+
+
+def parse_timestamp(stamp):
+    """Parse a timestamp created by :func:`timestamp`.
+
+    This accepts timestamps with or without microseconds, since cassettes
+    recorded by older versions of Betamax only have whole seconds. Slicing
+    the string is considerably faster than ``datetime.strptime``.
+    """
+    microsecond = 0
+    if len(stamp) > 20 and stamp[19] == '.':
+        microsecond = int(stamp[20:26].ljust(6, '0'))
+    return datetime(
+        int(stamp[0:4]), int(stamp[5:7]), int(stamp[8:10]),
+        int(stamp[11:13]), int(stamp[14:16]), int(stamp[17:19]), microsecond
+    )
+
+
+def total_seconds(delta):
+    return delta.days * 86400 + delta.seconds + delta.microseconds / 1e6
 
 
 def _option_from(option, kwargs, defaults):
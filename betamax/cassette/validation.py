@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""Find problems in cassettes before they are replayed or re-recorded."""
+import json
+
+from .util import Sanitizer, parse_timestamp
+
+try:
+    string_types = basestring
+except NameError:
+    string_types = str
+
+
+def check_structure(data):
+    """Return the problems with the structure of a deserialized cassette.
+
+    This only uses ``isinstance`` checks, so it is cheap enough to run every
+    time a cassette is loaded. Cassettes recorded by older versions of
+    Betamax, with plain string bodies and headers, are valid.
+
+    :param dict data: the cassette, as returned by a serializer
+    :returns: list of descriptions of the problems found
+    """
+    if not isinstance(data, dict):
+        return ['the cassette is not a mapping']
+    interactions = data.get('http_interactions')
+    if not isinstance(interactions, list):
+        return ['http_interactions is missing or not a list']
+
+    problems = []
+    for (n, interaction) in enumerate(interactions):
+        problems.extend('interaction {0}: {1}'.format(n, problem)
+                        for problem in check_interaction(interaction))
+    return problems
+
+
+def check_interaction(interaction):
+    """Return the problems with a serialized interaction."""
+    if not isinstance(interaction, dict):
+        return ['not a mapping']
+
+    problems = []
+    recorded_at = interaction.get('recorded_at')
+    if not isinstance(recorded_at, string_types):
+        problems.append('recorded_at is missing or not a string')
+    else:
+        try:
+            parse_timestamp(recorded_at)
+        except ValueError:
+            problems.append('recorded_at is not a valid timestamp')
+
+    request = interaction.get('request')
+    if not isinstance(request, dict):
+        problems.append('request is missing or not a mapping')
+    else:
+        problems.extend(_check_message('request', request))
+        for key in ('method', 'uri'):
+            if not isinstance(request.get(key), string_types):
+                problems.append(
+                    'request.{0} is missing or not a string'.format(key)
+                    )
+
+    response = interaction.get('response')
+    if not isinstance(response, dict):
+        problems.append('response is missing or not a mapping')
+    else:
+        problems.extend(_check_message('response', response))
+        status = response.get('status')
+        if isinstance(status, dict):
+            if not isinstance(status.get('code'), int):
+                problems.append('response.status.code is not an integer')
+        elif not isinstance(response.get('status_code'), int):
+            problems.append('response.status is missing')
+    return problems
+
+
+def _check_message(name, message):
+    problems = []
+    headers = message.get('headers')
+    if not isinstance(headers, dict):
+        problems.append('{0}.headers is missing or not a mapping'.format(name))
+    else:
+        for (header, value) in headers.items():
+            values = value if isinstance(value, list) else [value]
+            if not all(isinstance(v, string_types) for v in values):
+                problems.append('{0}.headers.{1} is not a string'.format(
+                    name, header
+                    ))
+
+    body = message.get('body')
+    if isinstance(body, dict):
+        content = body.get('string', body.get('base64_string'))
+        if not isinstance(content, string_types):
+            problems.append(
+                '{0}.body has neither string nor base64_string'.format(name)
+                )
+    elif not isinstance(body, string_types):
+        problems.append('{0}.body is missing'.format(name))
+    return problems
+
+
+def find_duplicate_keys(text):
+    """Return the keys repeated within an object of a JSON document.
+
+    ``json`` silently keeps the last value of a repeated key, which hides
+    mistakes made while editing cassettes by hand. This finds nothing on
+    Python 2.6, whose ``json`` cannot tell.
+    """
+    duplicates = []
+
+    def check(pairs):
+        seen = set()
+        for (key, _) in pairs:
+            if key in seen:
+                duplicates.append(key)
+            seen.add(key)
+        return dict(pairs)
+
+    try:
+        json.loads(text, object_pairs_hook=check)
+    except TypeError:
+        # object_pairs_hook was added in Python 2.7
+        return []
+    return duplicates
+
+
+def find_secrets(text, placeholders):
+    """Return the placeholders whose values appear in ``text``.
+
+    :param str text: a serialized cassette, which should only contain the
+        placeholders
+    :param list placeholders: dictionaries with ``'placeholder'`` and
+        ``'replace'`` keys, as passed to ``use_cassette``
+    """
+    sanitizer = Sanitizer(placeholders)
+    if sanitizer.pattern is None:
+        return []
+    found = set(sanitizer.placeholders[value]
+                for value in sanitizer.pattern.findall(text))
+    return sorted(found)
+
+
+def describe_error(error, text):
+    """Describe why a serializer could not read ``text``."""
+    # json reports where it failed, which is the end of a truncated file
+    # unless it stopped in the middle of a string
+    position = getattr(error, 'pos', None)
+    truncated = str(error).startswith('Unterminated string') or (
+        position is not None and position >= len(text.rstrip())
+        )
+    if truncated:
+        return 'the cassette is truncated: {0}'.format(error)
+    return 'the cassette cannot be read: {0}'.format(error)
+
+
+def lint(text, serializer, placeholders=()):
+    """Return every problem found in a serialized cassette.
+
+    :param str text: the content of the cassette file
+    :param serializer: the serializer the cassette was written with
+    :param list placeholders: the placeholders whose values must not appear
+        in the cassette
+    """
+    if not text.strip():
+        # A cassette which was never recorded
+        return []
+    try:
+        data = serializer.deserialize(text)
+    except ValueError as error:
+        return [describe_error(error, text)]
+
+    problems = check_structure(data)
+    if serializer.name == 'json':
+        problems.extend('duplicate key {0!r}'.format(key)
+                        for key in find_duplicate_keys(text))
+    problems.extend('unsanitized value of {0}'.format(placeholder)
+                    for placeholder in find_secrets(text, placeholders))
+    return problems
@@ -0,0 +1,522 @@
+# -*- coding: utf-8 -*-
+"""Command-line tools to maintain a library of cassettes.
+
+.. code-block:: sh
+
+    betamax stats tests/cassettes
+    betamax dedupe --jobs 8 tests/cassettes
+    betamax sanitize --placeholder '<TOKEN>=s3cr3t' tests/cassettes
+    betamax lint tests/cassettes
+    betamax serve --base-url https://api.github.com tests/cassettes/github.json
+    betamax record --port 8080 tests/cassettes/captured.json
+    betamax --import myproject.serializers convert --to yaml tests/cassettes
+
+Every command accepts cassette files and directories, which are searched
+recursively for cassettes written by the serializer given with ``--serializer``
+(``json`` by default). Cassettes are processed in parallel, one per CPU core
+unless ``--jobs`` says otherwise, and each one is rewritten atomically.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+from .cassette import Cassette
+from .cassette.util import Sanitizer, parse_timestamp
+from .cassette.validation import check_structure, describe_error, lint
+from .exceptions import InvalidCassette
+from .serializers import serializer_registry
+from .server import RecordingProxy, ReplayServer
+
+
+def find_cassettes(paths, serializer):
+    """Yield the path of every cassette in ``paths``.
+
+    :param list paths: cassette files and directories to search recursively
+    :param str serializer: name of the serializer which wrote the cassettes
+    """
+    suffix = cassette_suffix(serializer)
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for (directory, dirnames, filenames) in os.walk(path):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.endswith(suffix):
+                    yield os.path.join(directory, filename)
+
+
+def cassette_suffix(serializer):
+    """Return what the names of cassette files end with, e.g. ``.json``."""
+    return serializer_registry[serializer].generate_cassette_name(
+        '', '\0'
+        ).split('\0')[-1]
+
+
+def read(path):
+    try:
+        with open(path) as fd:
+            return fd.read()
+    except EnvironmentError as error:
+        raise InvalidCassette(path, ['the cassette cannot be read: {0}'.format(
+            error.strerror or error
+            )])
+
+
+def load(path, serializer):
+    """Return the data of a cassette whose structure is valid.
+
+    Cassettes without ``http_interactions`` are empty and returned as is.
+    """
+    content = read(path)
+    try:
+        data = serializer_registry[serializer].deserialize(content)
+    except ValueError as error:
+        raise InvalidCassette(path, [describe_error(error, content)])
+    if isinstance(data, dict) and 'http_interactions' not in data:
+        return data
+    problems = check_structure(data)
+    if problems:
+        raise InvalidCassette(path, problems)
+    return data
+
+
+def file_size(path):
+    """Return the size of a file, 0 if it does not exist."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def dump(path, data, serializer, original):
+    """Write a cassette by replacing its file, so it is never half written.
+
+    :param str original: path of the cassette the data was read from, whose
+        permissions are given to the new file
+    """
+    content = serializer_registry[serializer].serialize(data)
+    (fd, tmp_path) = tempfile.mkstemp(dir=os.path.dirname(path) or '.',
+                                      prefix='.betamax-')
+    try:
+        with os.fdopen(fd, 'w') as tmp:
+            tmp.write(content)
+        shutil.copymode(original, tmp_path)
+        if os.path.exists(path) and sys.platform == 'win32':
+            os.remove(path)
+        os.rename(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def interaction_key(interaction):
+    """Return what has to be identical for two interactions to be duplicates.
+
+    When and how fast an interaction was recorded does not matter.
+    """
+    response = dict(interaction['response'])
+    response.pop('elapsed', None)
+    return json.dumps([interaction['request'], response], sort_keys=True)
+
+
+def body_size(body):
+    if not isinstance(body, dict):
+        return len(body or '')
+    return len(body.get('string') or body.get('base64_string') or '')
+
+
+def cassette_stats(path, serializer):
+    """Return the size of a cassette and what is in it."""
+    error = None
+    try:
+        data = load(path, serializer)
+    except InvalidCassette as exc:
+        (data, error) = ({}, exc.problems[0])
+    interactions = data.get('http_interactions', [])
+    dates = sorted(parse_timestamp(i['recorded_at']) for i in interactions)
+    return {
+        'cassette': path,
+        'size': file_size(path),
+        'interactions': len(interactions),
+        'duplicates': (len(interactions) -
+                       len(set(interaction_key(i) for i in interactions))),
+        'body_size': sum(body_size(i['request']['body']) +
+                         body_size(i['response']['body'])
+                         for i in interactions),
+        'oldest': dates[0].isoformat() if dates else None,
+        'newest': dates[-1].isoformat() if dates else None,
+        'recorded_with': data.get('recorded_with'),
+        'error': error,
+    }
+
+
+def rewrite(path, serializer, transform, target=None):
+    """Rewrite a cassette after passing its data through ``transform``.
+
+    :param transform: function returning the new data of the cassette, or
+        None if it does not need to be rewritten
+    :param str target: name of the serializer to write the cassette with, if
+        it differs from ``serializer``. The original cassette is kept.
+    :returns: a summary of what changed
+    """
+    size = file_size(path)
+    result = {'cassette': path, 'size': size, 'new_size': size}
+    try:
+        data = load(path, serializer)
+    except InvalidCassette as exc:
+        result['error'] = exc.problems[0]
+        return result
+
+    if 'http_interactions' not in data:
+        # Empty or unreadable, leave it alone
+        result['skipped'] = True
+        return result
+
+    interactions = len(data['http_interactions'])
+    data = transform(data)
+    if data is None:
+        result['unchanged'] = True
+        return result
+
+    new_path = path
+    if target is not None:
+        directory = os.path.dirname(path)
+        name = os.path.basename(path)[:-len(cassette_suffix(serializer))]
+        new_path = serializer_registry[target].generate_cassette_name(
+            directory, name
+            )
+    dump(new_path, data, target or serializer, path)
+    result.update({
+        'new_cassette': new_path,
+        'new_size': os.path.getsize(new_path),
+        'interactions': interactions,
+        'new_interactions': len(data['http_interactions']),
+    })
+    return result
+
+
+def identity(data):
+    return data
+
+
+def drop_duplicates(data):
+    """Keep only the first of identical interactions.
+
+    Returns None if there were no duplicates.
+    """
+    seen = set()
+    interactions = []
+    for interaction in data['http_interactions']:
+        key = interaction_key(interaction)
+        if key not in seen:
+            seen.add(key)
+            interactions.append(interaction)
+    if len(interactions) == len(data['http_interactions']):
+        return None
+    data['http_interactions'] = interactions
+    return data
+
+
+def sanitizer_for(placeholders, _sanitizers={}):
+    # Every worker compiles the placeholders once
+    key = tuple((p['placeholder'], p['replace']) for p in placeholders)
+    if key not in _sanitizers:
+        _sanitizers[key] = Sanitizer(placeholders)
+    return _sanitizers[key]
+
+
+def insert_placeholders(data, placeholders):
+    """Insert placeholders, returning None if nothing was replaced."""
+    sanitizer = sanitizer_for(placeholders)
+    replacements = sanitizer.replacements
+    for interaction in data['http_interactions']:
+        sanitizer.sanitize_interaction(interaction)
+    if sanitizer.replacements == replacements:
+        return None
+    return data
+
+
+def run_stats(args):
+    return cassette_stats(args[0], args[1])
+
+
+def run_compact(args):
+    return rewrite(args[0], args[1], identity)
+
+
+def run_dedupe(args):
+    return rewrite(args[0], args[1], drop_duplicates)
+
+
+def run_convert(args):
+    return rewrite(args[0], args[1], identity, args[2])
+
+
+def run_sanitize(args):
+    return rewrite(args[0], args[1],
+                   lambda data: insert_placeholders(data, args[2]))
+
+
+def run_lint(args):
+    (path, serializer, placeholders) = args
+    try:
+        content = read(path)
+    except InvalidCassette as exc:
+        return {'cassette': path, 'problems': exc.problems}
+    return {
+        'cassette': path,
+        'problems': lint(content, serializer_registry[serializer],
+                         placeholders),
+    }
+
+
+def import_modules(modules):
+    for module in modules:
+        __import__(module)
+
+
+def print_stats(results, as_json=False):
+    if as_json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+        return
+
+    row = '{0:>10} {1:>12} {2:>10} {3:>12} {4:>19}  {5}'
+    print(row.format('size KiB', 'interactions', 'duplicates', 'bodies KiB',
+                     'oldest', 'cassette'))
+    for r in results:
+        print(row.format(r['size'] // 1024, r['interactions'],
+                         r['duplicates'], r['body_size'] // 1024,
+                         (r['oldest'] or '-')[:19], r['cassette']))
+    print(row.format(sum(r['size'] for r in results) // 1024,
+                     sum(r['interactions'] for r in results),
+                     sum(r['duplicates'] for r in results),
+                     sum(r['body_size'] for r in results) // 1024,
+                     '', 'total ({0} cassettes)'.format(len(results))))
+    for r in results:
+        if r['error']:
+            sys.stderr.write('{0}: {1}\n'.format(r['cassette'], r['error']))
+
+
+def print_rewrites(results):
+    for r in results:
+        if r.get('skipped'):
+            print('{0}: skipped, no interactions found'.format(r['cassette']))
+            continue
+        if r.get('error'):
+            print('{0}: skipped, {1}'.format(r['cassette'], r['error']))
+            continue
+        if r.get('unchanged'):
+            continue
+        print('{0}: {1} -> {2} interactions, {3} -> {4} bytes{5}'.format(
+            r['cassette'], r['interactions'], r['new_interactions'],
+            r['size'], r['new_size'],
+            '' if r['new_cassette'] == r['cassette'] else
+            ', written to {0}'.format(r['new_cassette'])
+        ))
+    rewritten = sum(1 for r in results if 'new_cassette' in r)
+    saved = sum(r['size'] - r['new_size'] for r in results)
+    print('{0} cassettes, {1} rewritten, {2} bytes saved'.format(
+        len(results), rewritten, saved))
+
+
+def serve(args):
+    """Replay, or record, a cassette over HTTP until interrupted."""
+    (directory, name) = os.path.split(os.path.abspath(args.path))
+    suffix = cassette_suffix(args.serializer)
+    if suffix and name.endswith(suffix):
+        name = name[:-len(suffix)]
+    record_mode = getattr(args, 'record_mode', 'none')
+    cassette = Cassette(name, args.serializer, record_mode=record_mode,
+                        cassette_library_dir=directory)
+
+    options = (args.base_url, args.match_requests_on or None,
+               (args.host, args.port))
+    if args.command == 'record':
+        server = RecordingProxy(cassette, *options,
+                                pool_maxsize=args.pool_maxsize,
+                                timeout=args.timeout)
+        print('Recording {0} through {1}'.format(args.path, server.url))
+    else:
+        server = ReplayServer(cassette, *options)
+        print('Replaying {0} on {1}'.format(args.path, server.url))
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+def print_problems(results):
+    for r in results:
+        for problem in r['problems']:
+            print('{0}: {1}'.format(r['cassette'], problem))
+    invalid = sum(1 for r in results if r['problems'])
+    print('{0} cassettes, {1} with problems'.format(len(results), invalid))
+
+
+COMMANDS = {
+    'stats': run_stats,
+    'compact': run_compact,
+    'dedupe': run_dedupe,
+    'convert': run_convert,
+    'sanitize': run_sanitize,
+    'lint': run_lint,
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='betamax', description='Maintain a library of cassettes.'
+        )
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='number of cassettes to process at once '
+                             '(default: the number of CPU cores)')
+    parser.add_argument('-s', '--serializer', default='json',
+                        help='serializer the cassettes were written with')
+    parser.add_argument('--import', dest='modules', action='append',
+                        default=[], metavar='MODULE',
+                        help='import MODULE first, e.g. to register a '
+                             'serializer (may be repeated)')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    stats = commands.add_parser(
+        'stats', help='show the size and contents of cassettes'
+        )
+    stats.add_argument('--json', action='store_true',
+                       help='print the statistics as JSON')
+    compact = commands.add_parser(
+        'compact', help='rewrite cassettes the way the serializer writes them'
+        )
+    dedupe = commands.add_parser(
+        'dedupe', help='drop interactions identical to an earlier one. This '
+                       'changes what is replayed when replay_order is '
+                       '"sequential" or "cycle"'
+        )
+    convert = commands.add_parser(
+        'convert', help='write cassettes with another serializer'
+        )
+    convert.add_argument('--to', required=True, metavar='SERIALIZER',
+                         help='serializer to write the cassettes with')
+
+    sanitize = commands.add_parser(
+        'sanitize', help='replace secrets with placeholders in cassettes'
+        )
+
+    lint = commands.add_parser(
+        'lint', help='find broken, hand-edited or unsanitized cassettes'
+        )
+
+    for command in (sanitize, lint):
+        command.add_argument(
+            '-p', '--placeholder', dest='placeholders', action='append',
+            default=[], metavar='PLACEHOLDER=VALUE',
+            help='replace VALUE with PLACEHOLDER (may be repeated). The '
+                 'placeholders defined with Betamax.configure() in the '
+                 'modules imported with --import are used by default'
+            )
+        command.add_argument(
+            '--placeholders-file', metavar='PATH',
+            help='JSON file with a list of placeholders, as passed to '
+                 'use_cassette'
+            )
+
+    serve = commands.add_parser(
+        'serve', help='replay a cassette over HTTP to any client'
+        )
+    record = commands.add_parser(
+        'record', help='record what any client sends through an HTTP proxy'
+        )
+    record.add_argument('--record-mode', default='new_episodes',
+                        choices=['all', 'new_episodes', 'once'],
+                        help='when to record requests (new_episodes)')
+    record.add_argument('--pool-maxsize', type=int, default=10,
+                        help='connections to keep open to each upstream host '
+                             '(10)')
+    record.add_argument('--timeout', type=float, default=None,
+                        help='seconds to wait for upstream servers')
+
+    for command in (serve, record):
+        command.add_argument('--host', default='127.0.0.1',
+                             help='address to listen on (127.0.0.1)')
+        command.add_argument('--port', type=int, default=8000,
+                             help='port to listen on (8000)')
+        command.add_argument('--base-url', metavar='URL',
+                             help='URL put in front of the path of requests '
+                                  'sent to the server itself')
+        command.add_argument('-m', '--match-requests-on', action='append',
+                             default=[], metavar='MATCHER',
+                             help='matcher to use (may be repeated, default: '
+                                  'the configured matchers)')
+        command.add_argument('path', help='cassette to replay or record')
+
+    for command in (stats, compact, dedupe, convert, sanitize, lint):
+        command.add_argument('paths', nargs='+', metavar='path',
+                             help='cassette or directory of cassettes')
+    return parser.parse_args(argv)
+
+
+def read_placeholders(args):
+    placeholders = []
+    if args.placeholders_file:
+        with open(args.placeholders_file) as fd:
+            placeholders.extend(json.load(fd))
+    for placeholder in args.placeholders:
+        (placeholder, _, replace) = placeholder.partition('=')
+        placeholders.append({'placeholder': placeholder, 'replace': replace})
+    if not placeholders:
+        placeholders = Cassette.default_cassette_options['placeholders']
+    return placeholders
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    import_modules(args.modules)
+    for name in (args.serializer, getattr(args, 'to', None)):
+        if name is not None and name not in serializer_registry:
+            sys.stderr.write('No serializer registered for {0}\n'.format(name))
+            return 2
+
+    if args.command in ('serve', 'record'):
+        return serve(args)
+
+    option = getattr(args, 'to', None)
+    if args.command in ('sanitize', 'lint'):
+        option = read_placeholders(args)
+        if args.command == 'sanitize' and not option:
+            sys.stderr.write('No placeholders were given or configured\n')
+            return 2
+
+    work = [(path, args.serializer, option)
+            for path in find_cassettes(args.paths, args.serializer)]
+    if args.jobs == 1 or len(work) < 2:
+        results = [COMMANDS[args.command](w) for w in work]
+    else:
+        pool = multiprocessing.Pool(args.jobs, import_modules,
+                                    (args.modules,))
+        try:
+            results = pool.map(COMMANDS[args.command], work, chunksize=8)
+        finally:
+            pool.close()
+            pool.join()
+
+    if args.command == 'stats':
+        print_stats(results, args.json)
+    elif args.command == 'lint':
+        print_problems(results)
+        return 1 if any(r['problems'] for r in results) else 0
+    else:
+        print_rewrites(results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
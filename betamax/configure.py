@@ -48,11 +48,19 @@ class Configuration(object):
 
         The options include:
 
+        - ``decode_compressed_bodies``
         - ``match_requests_on``
+        - ``max_replay_latency``
         - ``placeholders``
         - ``re_record_interval``
+        - ``re_record_scope``
         - ``record_mode``
         - ``preserve_exact_body_bytes``
+        - ``preserve_chunks``
+        - ``prune_unused_interactions``
+        - ``replay_latency``
+        - ``replay_order``
+        - ``validate_interactions``
 
         Other options will be ignored.
         """
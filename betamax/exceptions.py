@@ -4,3 +4,19 @@ class BetamaxError(Exception):
 
     def __repr__(self):
         return 'BetamaxError("%s")' % self.message
+
+
+class InvalidCassette(BetamaxError):
+
+    """Raised when a cassette is invalid, instead of re-recording it."""
+
+    def __init__(self, cassette_path, problems):
+        #: Path of the invalid cassette
+        self.cassette_path = cassette_path
+        #: Descriptions of what is wrong with it
+        self.problems = problems
+        super(InvalidCassette, self).__init__(
+            'The cassette {0} is invalid:\n{1}'.format(
+                cassette_path, '\n'.join('- ' + p for p in problems)
+            )
+        )
@@ -3,8 +3,10 @@ matcher_registry = {}
 from .base import BaseMatcher
 from .body import BodyMatcher
 from .digest_auth import DigestAuthMatcher
+from .form_body import FormBodyMatcher
 from .headers import HeadersMatcher
 from .host import HostMatcher
+from .json_body import JSONBodyMatcher
 from .method import MethodMatcher
 from .path import PathMatcher
 from .query import QueryMatcher
@@ -12,11 +14,13 @@ from .uri import URIMatcher
 
 
 __all__ = ('BaseMatcher', 'BodyMatcher', 'DigestAuthMatcher',
-           'HeadersMatcher', 'HostMatcher', 'MethodMatcher', 'PathMatcher',
-           'QueryMatcher', 'URIMatcher')
+           'FormBodyMatcher', 'HeadersMatcher', 'HostMatcher',
+           'JSONBodyMatcher', 'MethodMatcher', 'PathMatcher', 'QueryMatcher',
+           'URIMatcher')
 
 
-_matchers = [BodyMatcher, DigestAuthMatcher, HeadersMatcher, HostMatcher,
-             MethodMatcher, PathMatcher, QueryMatcher, URIMatcher]
+_matchers = [BodyMatcher, DigestAuthMatcher, FormBodyMatcher, HeadersMatcher,
+             HostMatcher, JSONBodyMatcher, MethodMatcher, PathMatcher,
+             QueryMatcher, URIMatcher]
 matcher_registry.update(dict((m.name, m()) for m in _matchers))
 del _matchers
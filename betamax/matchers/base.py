@@ -60,3 +60,34 @@ class BaseMatcher(object):
         """
         raise NotImplementedError('The match method must be implemented on'
                                   ' %s' % self.__class__.__name__)
+
+    def key(self, request):
+        """An optional method returning a hashable summary of the request.
+
+        If every matcher in use for a cassette implements this, Betamax builds
+        an index of the recorded interactions and finds matches with a single
+        dictionary lookup instead of calling ``match`` on each interaction.
+
+        Two requests for which ``match`` would return True must have equal
+        keys. Returning ``None`` means the matcher cannot be indexed and
+        Betamax will fall back to calling ``match``. So does a matcher which
+        overrides ``match`` without overriding ``key`` as well.
+
+        :param PreparedRequest request: A requests PreparedRequest object. For
+            recorded interactions this is the deserialized recorded request.
+        :returns: a hashable object or None
+        """
+        return None
+
+    def indexable(self):
+        """Return whether ``key`` was written for this matcher's ``match``.
+
+        That is, whether the class which defines ``match`` or one of its
+        subclasses defines ``key``.
+        """
+        mro = type(self).__mro__
+        (match_owner, key_owner) = [
+            next(n for (n, cls) in enumerate(mro) if name in vars(cls))
+            for name in ('match', 'key')
+            ]
+        return key_owner <= match_owner
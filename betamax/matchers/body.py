@@ -10,3 +10,6 @@ class BodyMatcher(BaseMatcher):
     def match(self, request, recorded_request):
         recorded_request = deserialize_prepared_request(recorded_request)
         return recorded_request.body == (request.body or b'')
+
+    def key(self, request):
+        return request.body or b''
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+from .base import BaseMatcher
+from ..cassette.util import coerce_content, deserialize_prepared_request
+
+import hashlib
+
+try:
+    from urlparse import parse_qsl
+    from urllib import urlencode
+except ImportError:
+    from urllib.parse import parse_qsl, urlencode
+
+
+class FormBodyMatcher(BaseMatcher):
+
+    """Matches based on the form-encoded parameters of the request body.
+
+    Parameters are decoded and sorted before being compared, so neither the
+    order of the parameters nor the way they were percent-encoded matters.
+    """
+
+    name = 'form-body'
+
+    def match(self, request, recorded_request):
+        recorded_request = deserialize_prepared_request(recorded_request)
+        return self.key(request) == self.key(recorded_request)
+
+    def key(self, request):
+        body = request.body
+        if body and not (hasattr(body, 'encode') or hasattr(body, 'decode')):
+            # Files and generators are read while sending, not compared
+            return None
+        canonical = self.canonicalize(body)
+        return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+    def canonicalize(self, body):
+        body = coerce_content(body or '')
+        return urlencode(sorted(parse_qsl(body, keep_blank_values=True)))
@@ -3,13 +3,57 @@ from .base import BaseMatcher
 
 
 class HeadersMatcher(BaseMatcher):
-    # Matches based on the headers of the request
+
+    """Matches based on the headers of the request.
+
+    Header names are compared case-insensitively. To leave volatile headers
+    out of the comparison, or to only compare a few headers, sub-class this
+    matcher, set ``include`` or ``exclude`` and register it under a new name:
+
+    .. code-block:: python
+
+        from betamax import Betamax
+        from betamax.matchers import HeadersMatcher
+
+        class StableHeadersMatcher(HeadersMatcher):
+            name = 'stable-headers'
+            exclude = ['Date', 'User-Agent', 'X-Request-Id']
+
+        Betamax.register_request_matcher(StableHeadersMatcher)
+
+    """
+
     name = 'headers'
 
+    #: Names of the headers to compare. ``None`` compares all of them.
+    include = None
+
+    #: Names of the headers to ignore.
+    exclude = ()
+
+    def on_init(self):
+        self.included_names = None
+        if self.include is not None:
+            self.included_names = frozenset(h.lower() for h in self.include)
+        self.excluded_names = frozenset(h.lower() for h in self.exclude)
+
     def match(self, request, recorded_request):
-        return dict(request.headers) == self.flatten_headers(recorded_request)
+        recorded_headers = self.flatten_headers(recorded_request)
+        return self.key(request) == self.normalize(recorded_headers)
+
+    def key(self, request):
+        return self.normalize(request.headers)
 
     def flatten_headers(self, request):
         from betamax.cassette.util import from_list
         headers = request['headers'].items()
         return dict((k, from_list(v)) for (k, v) in headers)
+
+    def normalize(self, headers):
+        """Return the headers we compare as a hashable set of pairs."""
+        normalized = ((k.lower(), v) for (k, v) in headers.items())
+        return frozenset(
+            (k, v) for (k, v) in normalized
+            if k not in self.excluded_names and
+            (self.included_names is None or k in self.included_names)
+        )
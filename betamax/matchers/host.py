@@ -11,3 +11,6 @@ class HostMatcher(BaseMatcher):
         request_host = urlparse(request.url).netloc
         recorded_host = urlparse(recorded_request['uri']).netloc
         return request_host == recorded_host
+
+    def key(self, request):
+        return urlparse(request.url).netloc
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+from .base import BaseMatcher
+from ..cassette.util import coerce_content, deserialize_prepared_request
+
+import hashlib
+import json
+
+
+class JSONBodyMatcher(BaseMatcher):
+
+    """Matches based on the JSON content of the request body.
+
+    Bodies are parsed and re-serialized with sorted keys and no insignificant
+    whitespace before being compared, so the order in which a client emits
+    object keys does not matter. Bodies which are not valid JSON are compared
+    as text.
+    """
+
+    name = 'json-body'
+
+    def match(self, request, recorded_request):
+        recorded_request = deserialize_prepared_request(recorded_request)
+        return self.key(request) == self.key(recorded_request)
+
+    def key(self, request):
+        body = request.body
+        if body and not (hasattr(body, 'encode') or hasattr(body, 'decode')):
+            # Files and generators are read while sending, not compared
+            return None
+        canonical = self.canonicalize(body)
+        return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+    def canonicalize(self, body):
+        body = coerce_content(body or '')
+        try:
+            parsed = json.loads(body)
+        except ValueError:
+            return body
+        return json.dumps(parsed, sort_keys=True, separators=(',', ':'))
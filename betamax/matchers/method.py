@@ -8,3 +8,6 @@ class MethodMatcher(BaseMatcher):
 
     def match(self, request, recorded_request):
         return request.method == recorded_request['method']
+
+    def key(self, request):
+        return request.method
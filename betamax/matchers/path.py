@@ -11,3 +11,6 @@ class PathMatcher(BaseMatcher):
         request_path = urlparse(request.url).path
         recorded_path = urlparse(recorded_request['uri']).path
         return request_path == recorded_path
+
+    def key(self, request):
+        return urlparse(request.url).path
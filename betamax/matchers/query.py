@@ -22,3 +22,7 @@ class QueryMatcher(BaseMatcher):
             urlparse(recorded_request['uri']).query
         )
         return request_query == recorded_query
+
+    def key(self, request):
+        query = self.to_dict(urlparse(request.url).query)
+        return tuple(sorted((k, tuple(v)) for (k, v) in query.items()))
@@ -10,13 +10,20 @@ class URIMatcher(BaseMatcher):
 
     def on_init(self):
         # Get something we can use to match query strings with
-        self.query_matcher = QueryMatcher().match
+        query_matcher = QueryMatcher()
+        self.query_matcher = query_matcher.match
+        self.query_key = query_matcher.key
 
     def match(self, request, recorded_request):
         queries_match = self.query_matcher(request, recorded_request)
         request_url, recorded_url = request.url, recorded_request['uri']
         return self.all_equal(request_url, recorded_url) and queries_match
 
+    def key(self, request):
+        parsed = self.parse(request.url)
+        return (parsed['scheme'], parsed['netloc'], parsed['path'],
+                parsed['fragment'], self.query_key(request))
+
     def parse(self, uri):
         parsed = urlparse(uri)
         return {
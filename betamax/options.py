@@ -5,15 +5,22 @@ def validate_record(record):
     return record in ['all', 'new_episodes', 'none', 'once']
 
 
+def validate_re_record_scope(re_record_scope):
+    return re_record_scope in ['cassette', 'interaction']
+
+
+def validate_replay_order(replay_order):
+    return replay_order in ['first', 'sequential', 'cycle']
+
+
 def validate_matchers(matchers):
     from betamax.matchers import matcher_registry
-    available_matchers = list(matcher_registry.keys())
-    return all(m in available_matchers for m in matchers)
+    return all(m in matcher_registry for m in matchers)
 
 
 def validate_serializer(serializer):
     from betamax.serializers import serializer_registry
-    return serializer in list(serializer_registry.keys())
+    return serializer in serializer_registry
 
 
 def validate_placeholders(placeholders):
@@ -23,43 +30,64 @@ def validate_placeholders(placeholders):
     )
 
 
-def translate_cassette_options():
-    for (k, v) in Cassette.default_cassette_options.items():
-        yield (k, v) if k != 'record_mode' else ('record', v)
+#: Names of the options in Cassette.default_cassette_options which differ
+cassette_option_names = {'record': 'record_mode'}
 
 
 class Options(object):
     valid_options = {
         'match_requests_on': validate_matchers,
         're_record_interval': lambda x: x is None or x > 0,
+        're_record_scope': validate_re_record_scope,
         'record': validate_record,
         'serialize': validate_serializer,  # TODO: Remove this
         'serialize_with': validate_serializer,
         'preserve_exact_body_bytes': lambda x: x in [True, False],
+        'preserve_chunks': lambda x: x in [True, False],
+        'decode_compressed_bodies': lambda x: x in [True, False],
+        'prune_unused_interactions': lambda x: x in [True, False],
+        'validate_interactions': lambda x: x in [True, False],
         'placeholders': validate_placeholders,
+        'replay_order': validate_replay_order,
+        'replay_latency': lambda x: x is None or x >= 0,
+        'max_replay_latency': lambda x: x is None or x >= 0,
     }
 
     defaults = {
         'match_requests_on': ['method', 'uri'],
         're_record_interval': None,
+        're_record_scope': 'cassette',
         'record': 'once',
         'serialize': None,  # TODO: Remove this
         'serialize_with': 'json',
         'preserve_exact_body_bytes': False,
+        'preserve_chunks': False,
+        'decode_compressed_bodies': False,
+        'prune_unused_interactions': False,
+        'validate_interactions': False,
         'placeholders': [],
+        'replay_order': 'first',
+        'replay_latency': None,
+        'max_replay_latency': None,
     }
 
     def __init__(self, data=None):
         self.data = data or {}
         self.validate()
-        self.defaults = Options.defaults.copy()
-        self.defaults.update(translate_cassette_options())
 
     def __repr__(self):
         return 'Options(%s)' % self.data
 
     def __getitem__(self, key):
-        return self.data.get(key, self.defaults.get(key))
+        if key in self.data:
+            return self.data[key]
+        # The configured defaults are looked up each time, rather than copied
+        # for every cassette, since they may change in between
+        cassette_defaults = Cassette.default_cassette_options
+        name = cassette_option_names.get(key, key)
+        if name in cassette_defaults:
+            return cassette_defaults[name]
+        return Options.defaults.get(key)
 
     def __setitem__(self, key, value):
         self.data[key] = value
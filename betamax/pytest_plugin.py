@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""A pytest plugin reporting how cassettes were used during a test run.
+
+It is installed with Betamax but does nothing unless ``--betamax-report`` or
+``--betamax-report-json`` is passed to ``py.test``.
+"""
+from .report import UsageReport
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('betamax')
+    group.addoption('--betamax-report', action='store_true', default=False,
+                    help='show how cassettes were used at the end of the run')
+    group.addoption('--betamax-report-json', metavar='PATH', default=None,
+                    help='write how each cassette was used to PATH as JSON')
+    group.addoption('--betamax-report-top', metavar='N', type=int,
+                    default=10, help='number of cassettes to show (10)')
+    group.addoption('--betamax-report-sort', default='time',
+                    choices=sorted(UsageReport.sort_keys),
+                    help='what to sort the cassettes shown by (time)')
+
+
+def pytest_configure(config):
+    if (config.getoption('betamax_report') or
+            config.getoption('betamax_report_json')):
+        config._betamax_report = UsageReport()
+        config._betamax_report.start()
+
+
+def pytest_runtest_setup(item):
+    report = getattr(item.config, '_betamax_report', None)
+    if report is not None:
+        report.current_test = item.nodeid
+
+
+def pytest_terminal_summary(terminalreporter):
+    config = terminalreporter.config
+    report = getattr(config, '_betamax_report', None)
+    if report is None or not config.getoption('betamax_report'):
+        return
+
+    terminalreporter.write_sep('-', 'betamax cassette usage')
+    table = report.format_table(config.getoption('betamax_report_top'),
+                                config.getoption('betamax_report_sort'))
+    for line in table.splitlines():
+        terminalreporter.write_line(line)
+
+
+def pytest_unconfigure(config):
+    report = getattr(config, '_betamax_report', None)
+    if report is None:
+        return
+
+    report.stop()
+    path = config.getoption('betamax_report_json')
+    if path:
+        report.write(path)
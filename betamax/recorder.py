@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import weakref
+
 from . import matchers, serializers
 from .adapter import BetamaxAdapter
 from .cassette import Cassette
@@ -43,16 +45,31 @@ class Betamax(object):
             vcr.use_cassette('example')
             r = s.get('https://httpbin.org/get')
 
+    When recording many requests, the connection pools used to record them
+    can be configured with the arguments of ``requests.adapters.HTTPAdapter``.
+    The pools are kept open from one cassette to the next and closed along
+    with the session, or by :meth:`close`.
+
+    .. code::
+
+        recorder = Betamax(s, adapter_kwargs={
+            'pool_maxsize': 20, 'max_retries': 3
+            })
+        ...
+        recorder.close()
+
     """
 
     def __init__(self, session, cassette_library_dir=None,
-                 default_cassette_options={}):
+                 default_cassette_options={}, adapter_kwargs=None):
         #: Store the requests.Session object being wrapped.
         self.session = session
         #: Store the session's original adapters.
         self.http_adapters = session.adapters.copy()
         #: Create a new adapter to replace the existing ones
-        self.betamax_adapter = BetamaxAdapter(old_adapters=self.http_adapters)
+        self.betamax_adapter = BetamaxAdapter(old_adapters=self.http_adapters,
+                                              **(adapter_kwargs or {}))
+        close_with_session(session, self.betamax_adapter)
         # We need a configuration instance to make life easier
         self.config = Configuration()
         # Merge the new cassette options with the default ones
@@ -77,6 +94,10 @@ class Betamax(object):
             # If you return False, Python will re-raise the exception for you
             return False
 
+    def close(self):
+        """Close the connection pools used to record interactions."""
+        self.betamax_adapter.close()
+
     @staticmethod
     def configure():
         """Help to configure the library as a whole.
@@ -99,6 +120,14 @@ class Betamax(object):
         """
         return self.betamax_adapter.cassette
 
+    @property
+    def stats(self):
+        """Counts and durations of what Betamax did for this session.
+
+        :returns: :class:`Stats <betamax.stats.Stats>`
+        """
+        return self.betamax_adapter.stats
+
     @staticmethod
     def register_request_matcher(matcher_class):
         """Register a new request matcher.
@@ -130,8 +159,8 @@ class Betamax(object):
         # No need to keep the cassette in memory any longer.
         self.betamax_adapter.eject_cassette()
         # On exit, we no longer wish to use our adapter and we want the
-        # session to behave normally! Woooo!
-        self.betamax_adapter.close()
+        # session to behave normally! Woooo! Its connection pools are left
+        # open for the next cassette, until close() or session.close().
         for (k, v) in self.http_adapters.items():
             self.session.mount(k, v)
 
@@ -166,3 +195,24 @@ class Betamax(object):
             raise ValueError('Cassette must have a valid name and may not be'
                              ' None.')
         return self
+
+
+def close_with_session(session, adapter):
+    """Close ``adapter`` when ``session.close()`` is called.
+
+    Once stopped, the recorder's adapter is no longer mounted on the session,
+    so ``Session.close`` would not reach it. The session only keeps weak
+    references to the adapters, so recorders are not kept alive by it.
+    """
+    adapters = getattr(session, '_betamax_adapters', None)
+    if adapters is None:
+        adapters = session._betamax_adapters = weakref.WeakKeyDictionary()
+        close_session = session.close
+
+        def close():
+            close_session()
+            for betamax_adapter in list(adapters.keys()):
+                betamax_adapter.close()
+
+        session.close = close
+    adapters[adapter] = True
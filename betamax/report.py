@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+
+from .stats import Stats
+
+
+class UsageReport(object):
+
+    """Collect how each cassette is used by every Betamax object.
+
+    While started, the report receives the events of every
+    :class:`Stats <betamax.stats.Stats>` object and adds them up per
+    cassette, along with the tests which used each cassette. Interactions
+    are counted once per cassette however many times it is loaded:
+
+    .. code-block:: python
+
+        report = UsageReport()
+        report.start()
+        ...  # run the tests
+        report.stop()
+        print(report.format_table(top=20, sort='unused'))
+
+    The pytest plugin in :mod:`betamax.pytest_plugin` does this for a whole
+    test run.
+    """
+
+    #: Events whose durations add up to the time Betamax spent on a cassette.
+    #: Sanitizing is part of saving and waiting for real servers is not
+    #: Betamax's overhead.
+    overhead_events = ('load', 'match', 'deserialize', 'record', 'save')
+
+    #: What the table can be sorted by, in decreasing order
+    sort_keys = {
+        'time': lambda c: c['time'],
+        'load': lambda c: c['load_time'],
+        'size': lambda c: c['size'] or 0,
+        'unused': lambda c: c['interactions'] - c['used'],
+        'misses': lambda c: c['misses'],
+    }
+
+    def __init__(self):
+        self.counts = {}
+        self.durations = {}
+        self.tests = {}
+        #: Number of interactions in each cassette when it was last loaded
+        self.interactions = {}
+        #: Positions of the interactions replayed from each cassette
+        self.used = {}
+        #: Name of the test currently running, if any
+        self.current_test = None
+
+    def __call__(self, event, cassette, count, duration):
+        counts = self.counts.setdefault(cassette, {})
+        counts[event] = counts.get(event, 0) + count
+        if duration is not None:
+            durations = self.durations.setdefault(cassette, {})
+            durations[event] = durations.get(event, 0.0) + duration
+        if event == 'loaded':
+            self.interactions[cassette] = count
+        if self.current_test is not None:
+            self.tests.setdefault(cassette, set()).add(self.current_test)
+
+    def interaction_used(self, cassette, position):
+        """Remember that the interaction at ``position`` was replayed."""
+        self.used.setdefault(cassette, set()).add(position)
+
+    def start(self):
+        """Start collecting the events of every Stats object."""
+        if self not in Stats.global_hooks:
+            Stats.global_hooks.append(self)
+            Stats.global_use_hooks.append(self.interaction_used)
+
+    def stop(self):
+        """Stop collecting events."""
+        if self in Stats.global_hooks:
+            Stats.global_hooks.remove(self)
+            Stats.global_use_hooks.remove(self.interaction_used)
+
+    def cassettes(self):
+        """Return how each cassette was used, sorted by path."""
+        cassettes = []
+        for path in sorted(p for p in self.counts if p is not None):
+            counts = self.counts[path]
+            durations = self.durations.get(path, {})
+            size = None
+            if os.path.exists(path):
+                size = os.path.getsize(path)
+            cassettes.append({
+                'cassette': path,
+                'size': size,
+                'tests': sorted(self.tests.get(path, ())),
+                'interactions': self.interactions.get(path, 0),
+                'used': len(self.used.get(path, ())),
+                'replays': counts.get('replay', 0),
+                'misses': counts.get('miss', 0),
+                'records': counts.get('record', 0),
+                'pruned': counts.get('pruned', 0),
+                'load_time': durations.get('load', 0.0),
+                'match_time': durations.get('match', 0.0),
+                'save_time': durations.get('save', 0.0),
+                'time': sum(durations.get(e, 0.0)
+                            for e in self.overhead_events),
+            })
+        return cassettes
+
+    def to_json(self):
+        """Return the report as a JSON document."""
+        return json.dumps({'cassettes': self.cassettes()}, indent=2,
+                          sort_keys=True)
+
+    def write(self, path):
+        """Write the report as JSON to ``path``."""
+        with open(path, 'w') as fd:
+            fd.write(self.to_json())
+
+    def format_table(self, top=10, sort='time'):
+        """Return the ``top`` cassettes, by ``sort``, as a readable table.
+
+        :param int top: how many cassettes to list, all of them if None
+        :param str sort: one of the keys of ``sort_keys``
+        """
+        cassettes = sorted(self.cassettes(), key=self.sort_keys[sort],
+                           reverse=True)[:top]
+        row = ('{0:>9} {1:>6} {2:>12} {3:>6} {4:>8} {5:>7} {6:>8} {7:>9} '
+               '{8:>9} {9:>9}  {10}')
+        lines = [row.format('size KiB', 'tests', 'interactions', 'used',
+                            'replays', 'misses', 'records', 'load ms',
+                            'save ms', 'total ms', 'cassette')]
+        for c in cassettes:
+            size = '-' if c['size'] is None else c['size'] // 1024
+            lines.append(row.format(
+                size, len(c['tests']), c['interactions'], c['used'],
+                c['replays'], c['misses'], c['records'],
+                milliseconds(c['load_time']),
+                milliseconds(c['save_time']), milliseconds(c['time']),
+                os.path.relpath(c['cassette'])
+            ))
+        return '\n'.join(lines)
+
+
+def milliseconds(seconds):
+    return '{0:.1f}'.format(seconds * 1000)
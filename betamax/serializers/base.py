@@ -84,6 +84,11 @@ class BaseSerializer(object):
                 'recorded_with': 'name of recorder'
             }
 
+        An empty dictionary means the cassette has not been recorded yet. If
+        ``cassette_data`` cannot be deserialized, raise a ``ValueError``
+        instead of returning an empty dictionary, so that Betamax reports the
+        broken cassette rather than re-recording it.
+
         :params str cassette_data: The data serialized as a string which needs
             to be deserialized.
         :returns: dictionary
@@ -17,9 +17,8 @@ class JSONSerializer(BaseSerializer):
         return json.dumps(cassette_data)
 
     def deserialize(self, cassette_data):
-        try:
-            deserialized_data = json.loads(cassette_data)
-        except ValueError:
-            deserialized_data = {}
-
-        return deserialized_data
+        # New cassettes are empty files. Anything else which is not valid
+        # JSON raises a ValueError rather than being silently re-recorded.
+        if not cassette_data.strip():
+            return {}
+        return json.loads(cassette_data)
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from .base import BaseSerializer
 
+import errno
 import os
 
 
@@ -32,17 +33,30 @@ class SerializerProxy(BaseSerializer):
 
     @classmethod
     def find(cls, serialize_with, cassette_library_dir, cassette_name):
-        from . import serializer_registry
-        serializer = serializer_registry.get(serialize_with)
+        (serializer, cassette_path) = cls.locate(
+            serialize_with, cassette_library_dir, cassette_name
+            )
         if serializer is None:
             raise ValueError(
                 'No serializer registered for {0}'.format(serialize_with)
                 )
+        return cls(serializer, cassette_path)
 
-        cassette_path = cls.generate_cassette_name(
+    @classmethod
+    def locate(cls, serialize_with, cassette_library_dir, cassette_name):
+        """Return the serializer and the path of a cassette.
+
+        ``(None, None)`` is returned if no serializer is registered as
+        ``serialize_with``.
+        """
+        from . import serializer_registry
+        serializer = serializer_registry.get(serialize_with)
+        if serializer is None:
+            return (None, None)
+
+        return (serializer, cls.generate_cassette_name(
             serializer, cassette_library_dir, cassette_name
-            )
-        return cls(serializer, cassette_path)
+            ))
 
     @staticmethod
     def generate_cassette_name(serializer, cassette_library_dir,
@@ -61,10 +75,20 @@ class SerializerProxy(BaseSerializer):
             fd.write(self.proxied_serializer.serialize(cassette_data))
 
     def deserialize(self):
-        self._ensure_path_exists()
-
-        data = {}
-        with open(self.cassette_path) as fd:
-            data = self.proxied_serializer.deserialize(fd.read())
-
-        return data
+        try:
+            with open(self.cassette_path) as fd:
+                content = fd.read()
+        except IOError as exc:
+            if exc.errno != errno.ENOENT:
+                raise
+            # A new cassette is created empty
+            self._ensure_path_exists()
+            content = ''
+
+        try:
+            return self.proxied_serializer.deserialize(content)
+        except ValueError as error:
+            from ..cassette.validation import describe_error
+            from ..exceptions import InvalidCassette
+            raise InvalidCassette(self.cassette_path,
+                                  [describe_error(error, content)])
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""Replay and record cassettes for clients which do not use requests.
+
+.. code-block:: python
+
+    from betamax.cassette import Cassette
+    from betamax.server import ReplayServer
+
+    cassette = Cassette('github', 'json', record_mode='none',
+                        cassette_library_dir='tests/cassettes')
+    with ReplayServer(cassette, base_url='https://api.github.com') as server:
+        urlopen(server.url + '/emojis')
+
+"""
+import threading
+import weakref
+from datetime import datetime, timedelta
+from timeit import default_timer
+
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+from requests.models import PreparedRequest
+
+from .adapter import unhandled_request_message
+from .cassette import Cassette
+from .cassette.util import body_bytes, total_seconds
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:  # Python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+
+#: Headers describing the connection to the recorded server, not the response
+HOP_BY_HOP_HEADERS = set(['connection', 'content-length', 'keep-alive',
+                          'transfer-encoding'])
+
+
+class ReplayServer(ThreadingMixIn, HTTPServer):
+
+    """Serve the interactions of a cassette on localhost.
+
+    Each request is matched against the cassette like a request sent through
+    a session using the cassette. Requests may be sent to the server itself,
+    in which case ``base_url`` is put in front of their path, or through it,
+    as to an HTTP proxy (``CONNECT`` is not supported, so only for plain
+    HTTP URLs). Requests no interaction matches get a 502 response.
+    Nothing is ever recorded.
+
+    Every connection is handled by its own thread and kept alive between
+    requests, while matching is done by one thread at a time.
+
+    :param cassette: the :class:`~betamax.cassette.Cassette` to replay
+    :param str base_url: URL the interactions were recorded from, e.g.,
+        ``https://api.github.com``
+    :param list match_requests_on: names of the matchers to use, the
+        configured default if None
+    :param tuple address: host and port to listen on, by default a free port
+        on ``127.0.0.1``
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, cassette, base_url=None, match_requests_on=None,
+                 address=('127.0.0.1', 0)):
+        HTTPServer.__init__(self, address, ReplayHandler)
+        self.cassette = cassette
+        self.base_url = (base_url or '').rstrip('/')
+        if match_requests_on is None:
+            match_requests_on = Cassette.default_cassette_options[
+                'match_requests_on'
+                ]
+        self.cassette.match_options = match_requests_on
+        self.lock = threading.Lock()
+        self.thread = None
+        # What is sent for each interaction. Interactions replaced while
+        # recording are dropped along with what was cached for them.
+        self.responses = weakref.WeakKeyDictionary()
+
+    @property
+    def url(self):
+        """The URL of the server, e.g., ``http://127.0.0.1:40127``."""
+        return 'http://{0}:{1}'.format(*self.server_address[:2])
+
+    def start(self):
+        """Serve requests from another thread until stopped."""
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving requests and close the socket."""
+        if self.thread is not None:
+            self.shutdown()
+            self.thread.join()
+            self.thread = None
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *ex_args):
+        self.stop()
+
+    def replay(self, request):
+        """Return the status, headers and body to send for ``request``.
+
+        :param request: the ``requests.PreparedRequest`` the client sent
+        :returns: tuple of the status code, reason, list of headers and body
+        """
+        interaction = self.find_interaction(request)
+        if interaction is None:
+            return error_response(unhandled_request_message(request,
+                                                            self.cassette))
+
+        response = self.responses.get(interaction)
+        if response is None:
+            response = serialized_response(interaction.json['response'])
+            self.responses[interaction] = response
+        return response
+
+    def find_interaction(self, request):
+        """Return the interaction matching ``request``, if any."""
+        cassette = self.cassette
+        with self.lock:
+            interaction = cassette.find_match(request)
+            cassette.stats.record('miss' if interaction is None else 'replay',
+                                  cassette.cassette_path)
+        return interaction
+
+
+class RecordingProxy(ReplayServer):
+
+    """Record what clients which do not use requests send through it.
+
+    Requests which the cassette has no interaction for are sent upstream,
+    if the cassette's record mode allows it, and their responses recorded.
+    The others are replayed like :class:`ReplayServer` does. The cassette is
+    written when the proxy is stopped.
+
+    Responses are read and serialized by the thread handling each client, so
+    that slow responses do not hold up the others, while connections to each
+    upstream host are reused from a pool.
+
+    :param cassette: the :class:`~betamax.cassette.Cassette` to record into
+    :param int pool_maxsize: number of connections to keep open to each
+        upstream host
+    :param float timeout: seconds to wait for upstream servers, forever if
+        None
+
+    The other parameters are those of :class:`ReplayServer`. With a
+    ``base_url``, clients may send requests to the proxy itself, which is
+    the only way to record ``https`` URLs.
+    """
+
+    def __init__(self, cassette, base_url=None, match_requests_on=None,
+                 address=('127.0.0.1', 0), pool_maxsize=10, timeout=None):
+        ReplayServer.__init__(self, cassette, base_url, match_requests_on,
+                              address)
+        self.adapter = HTTPAdapter(pool_maxsize=pool_maxsize)
+        self.timeout = timeout
+
+    def stop(self):
+        """Stop serving requests and write the cassette."""
+        ReplayServer.stop(self)
+        self.adapter.close()
+        with self.lock:
+            self.cassette.eject()
+
+    def replay(self, request):
+        try:
+            return ReplayServer.replay(self, request)
+        except RequestException as exc:
+            return error_response('The request to {0} failed: {1}'.format(
+                request.url, exc
+                ))
+
+    def find_interaction(self, request):
+        interaction = ReplayServer.find_interaction(self, request)
+        if interaction is None and self.cassette.is_recording(request):
+            interaction = self.record(request)
+        return interaction
+
+    def record(self, request):
+        """Send ``request`` upstream and record the response."""
+        cassette = self.cassette
+        started_at = datetime.utcnow()
+        start = default_timer()
+        try:
+            response = self.adapter.send(request, stream=True,
+                                         timeout=self.timeout)
+            time_to_first_byte = total_seconds(datetime.utcnow() - started_at)
+            response.elapsed = timedelta(seconds=time_to_first_byte)
+            upstream = default_timer() - start
+
+            serialized = cassette.serialize_interaction(
+                response, request, started_at, time_to_first_byte
+                )
+        except Exception:
+            with self.lock:
+                cassette.cancel_recording(request)
+            raise
+
+        with self.lock:
+            path = cassette.cassette_path
+            cassette.stats.record('upstream', path, duration=upstream)
+            cassette.stats.record('record', path,
+                                  duration=default_timer() - start - upstream)
+            return cassette.add_interaction(serialized, response, request)
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+
+    """Answer each request with the interaction it matches."""
+
+    protocol_version = 'HTTP/1.1'
+    # Otherwise the body of each response waits for the client to acknowledge
+    # the headers, which caps a kept-alive connection at ~25 requests/second
+    disable_nagle_algorithm = True
+
+    def replay(self):
+        request = PreparedRequest()
+        request.prepare(method=self.command, url=self.request_url(),
+                        headers=self.request_headers(),
+                        data=self.request_body() or None)
+        (status, reason, headers, body) = self.server.replay(request)
+
+        self.send_response(status, reason)
+        for (name, value) in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = replay
+    do_OPTIONS = replay
+
+    def request_url(self):
+        if not self.path.startswith('/'):
+            # Sent through the server as a proxy
+            return self.path
+        base_url = self.server.base_url
+        if not base_url:
+            base_url = 'http://' + self.headers.get('Host', 'localhost')
+        return base_url + self.path
+
+    def request_headers(self):
+        headers = {}
+        for name in self.headers.keys():
+            if name.lower() in ('host', 'proxy-connection'):
+                continue
+            headers[name] = ', '.join(get_all(self.headers, name))
+        return headers
+
+    def request_body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b';')[0], 16)
+                if not size:
+                    # Skip the trailers
+                    while self.rfile.readline().strip():
+                        pass
+                    return b''.join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length)
+
+    def log_message(self, format, *args):
+        # Thousands of requests per second would flood stderr
+        pass
+
+
+def error_response(message):
+    """Return a 502 response explaining why a request was not answered."""
+    return (502, None, [('Content-Type', 'text/plain')],
+            message.encode('utf-8'))
+
+
+def get_all(headers, name):
+    """Return every value of a header in a request."""
+    if hasattr(headers, 'get_all'):
+        return headers.get_all(name)
+    return headers.getheaders(name)  # Python 2
+
+
+def serialized_response(serialized):
+    """Return the status, reason, headers and body of a recorded response.
+
+    The body is sent exactly as recorded, still compressed if it was.
+    """
+    status = serialized.get('status')
+    if status is None:
+        # Cassettes recorded by older versions of Betamax
+        status = {'code': serialized['status_code'], 'message': None}
+
+    headers = []
+    for (name, values) in serialized['headers'].items():
+        if name.lower() in HOP_BY_HOP_HEADERS:
+            continue
+        if not isinstance(values, list):
+            values = [values]
+        headers.extend((name, value) for value in values)
+
+    return (status['code'], status['message'], headers,
+            body_bytes(serialized['body']))
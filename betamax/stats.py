@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+from contextlib import contextmanager
+from timeit import default_timer
+
+
+class Stats(object):
+
+    """Count what Betamax does and how long it takes.
+
+    Events are counted per cassette, keyed by the cassette's path, along with
+    the cumulative number of seconds spent on them where that applies. The
+    events are:
+
+    - ``load``: reading a cassette and loading its interactions
+    - ``loaded``: interactions loaded from a cassette
+    - ``used``: loaded interactions replayed at least once
+    - ``deserialize``: building a response from a recorded interaction
+    - ``match``: looking for an interaction matching a request
+    - ``candidates``: interactions considered while looking for a match
+    - ``replay``: requests answered with a recorded interaction
+    - ``miss``: requests no recorded interaction matched
+    - ``record``: reading and serializing a new response
+    - ``upstream``: waiting for the headers of a real response while
+      recording
+    - ``pruned``: unused interactions dropped from a cassette
+    - ``sanitize``: inserting placeholders before a cassette is saved
+    - ``save``: writing a cassette, including sanitizing it
+
+    Each function in ``hooks`` is called as ``hook(event, cassette, count,
+    duration)`` every time an event is recorded, for example to forward it to
+    a metrics system. ``duration`` is None for events which are not timed.
+    Functions in ``Stats.global_hooks`` are called with the events of every
+    ``Stats`` object. Those in ``Stats.global_use_hooks`` are called as
+    ``hook(cassette, position)`` with the position in its cassette of every
+    interaction counted as ``used``.
+
+    .. code-block:: python
+
+        recorder = Betamax(session)
+        recorder.stats.hooks.append(send_to_statsd)
+        ...
+        print(recorder.stats.as_dict()['totals'])
+
+    """
+
+    #: Functions called with the events of every Stats object
+    global_hooks = []
+
+    #: Functions called with the position of every interaction used
+    global_use_hooks = []
+
+    def __init__(self):
+        #: Functions called with every event recorded
+        self.hooks = []
+        self.reset()
+
+    def reset(self):
+        """Forget every event recorded so far."""
+        #: Number of times each event happened, keyed by cassette path
+        self.counts = {}
+        #: Seconds spent on each event, keyed by cassette path
+        self.durations = {}
+
+    def record(self, event, cassette=None, count=1, duration=None):
+        """Record that ``event`` happened ``count`` times.
+
+        :param str event: name of the event
+        :param str cassette: path of the cassette the event happened with
+        :param int count: how many times it happened
+        :param float duration: how many seconds it took, if timed
+        """
+        counts = self.counts.setdefault(cassette, {})
+        counts[event] = counts.get(event, 0) + count
+        if duration is not None:
+            durations = self.durations.setdefault(cassette, {})
+            durations[event] = durations.get(event, 0.0) + duration
+        for hook in self.hooks:
+            hook(event, cassette, count, duration)
+        for hook in Stats.global_hooks:
+            hook(event, cassette, count, duration)
+
+    def record_use(self, cassette, position):
+        """Record that a loaded interaction was replayed for the first time.
+
+        :param str cassette: path of the cassette the interaction is in
+        :param int position: index of the interaction in the cassette
+        """
+        self.record('used', cassette)
+        for hook in Stats.global_use_hooks:
+            hook(cassette, position)
+
+    @contextmanager
+    def timer(self, event, cassette=None):
+        """Record ``event`` with the time spent in the ``with`` block."""
+        start = default_timer()
+        try:
+            yield
+        finally:
+            self.record(event, cassette, duration=default_timer() - start)
+
+    def totals(self):
+        """Return the counts and durations summed over every cassette."""
+        counts = {}
+        durations = {}
+        for (totals, per_cassette) in ((counts, self.counts),
+                                       (durations, self.durations)):
+            for events in per_cassette.values():
+                for (event, value) in events.items():
+                    totals[event] = totals.get(event, 0) + value
+        return {'counts': counts, 'durations': durations}
+
+    def as_dict(self):
+        """Return every event recorded, per cassette and in total."""
+        cassettes = {}
+        for cassette in set(self.counts) | set(self.durations):
+            cassettes[cassette] = {
+                'counts': dict(self.counts.get(cassette, {})),
+                'durations': dict(self.durations.get(cassette, {})),
+            }
+        return {'cassettes': cassettes, 'totals': self.totals()}
@@ -5,6 +5,8 @@ from setuptools import setup, find_packages
 
 packages = find_packages(exclude=['tests'])
 requires = ['requests >= 2.0']
+if sys.version_info < (2, 7):
+    requires.append('argparse')
 
 __version__ = ''
 with open('betamax/__init__.py', 'r') as fd:
@@ -42,6 +44,10 @@ setup(
     package_data={'': ['LICENSE', 'AUTHORS.rst']},
     include_package_data=True,
     install_requires=requires,
+    entry_points={
+        'console_scripts': ['betamax = betamax.cli:main'],
+        'pytest11': ['betamax = betamax.pytest_plugin'],
+    },
     classifiers=[
         'Development Status :: 4 - Beta',
         'License :: OSI Approved',
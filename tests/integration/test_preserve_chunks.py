@@ -0,0 +1,75 @@
+import base64
+import json
+import os
+import shutil
+import tempfile
+import zlib
+
+from .helper import IntegrationHelper
+from betamax import Betamax
+from betamax.configure import Configuration
+
+
+class TestPreserveChunks(IntegrationHelper):
+    cassette_created = False
+
+    def setUp(self):
+        super(TestPreserveChunks, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.library_dir = Configuration.CASSETTE_LIBRARY_DIR
+        interaction = {
+            'request': {
+                'body': {'encoding': 'utf-8', 'string': ''},
+                'headers': {},
+                'method': 'GET',
+                'uri': 'http://example.com/chunked',
+            },
+            'response': {
+                'body': {'encoding': 'utf-8', 'string': 'foobarbaz',
+                         'chunks': [2, 4, 3]},
+                'headers': {'Transfer-Encoding': ['chunked']},
+                'status': {'code': 200, 'message': 'OK'},
+                'url': 'http://example.com/chunked',
+            },
+            'recorded_at': '2015-04-18T12:00:00',
+        }
+        self.write('chunked', interaction)
+
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        gzipped = compressor.compress(b'foobarbaz') + compressor.flush()
+        interaction = json.loads(json.dumps(interaction))
+        interaction['response']['body'] = {
+            'base64_string': base64.b64encode(gzipped).decode(),
+            'chunks': [10, len(gzipped) - 10],
+            'encoding': 'utf-8',
+        }
+        interaction['response']['headers']['Content-Encoding'] = ['gzip']
+        self.write('gzipped', interaction)
+
+    def write(self, name, interaction):
+        path = os.path.join(self.directory, name + '.json')
+        with open(path, 'w') as fd:
+            json.dump({'http_interactions': [interaction]}, fd)
+
+    def tearDown(self):
+        super(TestPreserveChunks, self).tearDown()
+        Configuration.CASSETTE_LIBRARY_DIR = self.library_dir
+        shutil.rmtree(self.directory)
+
+    def test_replays_recorded_chunks(self):
+        recorder = Betamax(self.session, cassette_library_dir=self.directory)
+        with recorder.use_cassette('chunked', record='none'):
+            r = self.session.get('http://example.com/chunked', stream=True)
+            assert list(r.iter_content(100)) == [b'fo', b'obar', b'baz']
+
+            r = self.session.get('http://example.com/chunked', stream=True)
+            assert r.raw.read() == b'foobarbaz'
+
+    def test_decodes_compressed_chunked_bodies(self):
+        recorder = Betamax(self.session, cassette_library_dir=self.directory)
+        with recorder.use_cassette('gzipped', record='none',
+                                   preserve_chunks=True,
+                                   decode_compressed_bodies=True):
+            for _ in range(2):
+                r = self.session.get('http://example.com/chunked')
+                assert r.content == b'foobarbaz'
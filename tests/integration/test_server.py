@@ -0,0 +1,95 @@
+import gc
+import shutil
+import tempfile
+import unittest
+
+import requests
+
+from betamax.cassette import Cassette
+from betamax.server import RecordingProxy, ReplayServer
+
+
+class TestReplayServer(unittest.TestCase):
+    def setUp(self):
+        self.cassette = Cassette('GitHub_emojis', 'json', record_mode='none',
+                                 cassette_library_dir='tests/cassettes')
+        self.server = ReplayServer(self.cassette,
+                                   base_url='https://api.github.com/')
+        self.server.start()
+        self.session = requests.Session()
+
+    def tearDown(self):
+        self.session.close()
+        self.server.stop()
+
+    def test_replays_interactions(self):
+        for _ in range(2):
+            r = self.session.get(self.server.url + '/emojis')
+            assert r.status_code == 200
+            assert r.headers['Content-Encoding'] == 'gzip'
+            assert '+1' in r.json()
+        counts = self.cassette.stats.totals()['counts']
+        assert counts['replay'] == 2
+
+    def test_responses_are_cached_per_interaction(self):
+        self.session.get(self.server.url + '/emojis')
+        (interaction,) = self.cassette.interactions
+        assert list(self.server.responses.keys()) == [interaction]
+
+        self.cassette.clear()
+        del interaction
+        gc.collect()
+        assert len(self.server.responses) == 0
+
+    def test_unmatched_requests(self):
+        r = self.session.get(self.server.url + '/users')
+        assert r.status_code == 502
+        assert 'could not be handled' in r.text
+        assert self.cassette.stats.totals()['counts']['miss'] == 1
+
+    def test_requests_sent_through_the_server(self):
+        self.cassette.match_options = ['method', 'path']
+        r = self.session.get('http://example.com/emojis',
+                             proxies={'http': self.server.url})
+        assert r.status_code == 200
+
+
+class TestRecordingProxy(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cassette = Cassette('recorded', 'json', record_mode='once',
+                                 cassette_library_dir=self.directory)
+        # A replay server stands in for the upstream server
+        upstream = Cassette('GitHub_emojis', 'json', record_mode='none',
+                            cassette_library_dir='tests/cassettes')
+        self.upstream = ReplayServer(upstream,
+                                     base_url='https://api.github.com/')
+        self.upstream.start()
+        self.session = requests.Session()
+
+    def tearDown(self):
+        self.session.close()
+        self.upstream.stop()
+        shutil.rmtree(self.directory)
+
+    def test_records_interactions(self):
+        with RecordingProxy(self.cassette, base_url=self.upstream.url) as p:
+            for _ in range(2):
+                r = self.session.get(p.url + '/emojis')
+                assert r.status_code == 200
+                assert '+1' in r.json()
+
+        counts = self.cassette.stats.totals()['counts']
+        assert (counts['record'], counts['replay']) == (1, 1)
+        recorded = Cassette('recorded', 'json', record_mode='none',
+                            cassette_library_dir=self.directory)
+        assert len(recorded.interactions) == 1
+        assert recorded.interactions[0].json['request']['uri'] == (
+            self.upstream.url + '/emojis'
+            )
+
+    def test_unreachable_upstream(self):
+        with RecordingProxy(self.cassette, base_url='http://127.0.0.1:1') as p:
+            r = self.session.get(p.url + '/emojis')
+            assert r.status_code == 502
+            assert 'failed' in r.text
@@ -1,12 +1,16 @@
 import os
 import sys
+import time
 import unittest
 
 # sys.path.insert(0, os.path.abspath('.'))
 # sys.stderr.write('%s' % str(sys.path))
 
-from betamax.adapter import BetamaxAdapter
-from requests.adapters import HTTPAdapter
+from betamax.adapter import BetamaxAdapter, restore_elapsed
+from datetime import timedelta
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.exceptions import ConnectionError
+from requests.models import Response
 
 
 class TestBetamaxAdapter(unittest.TestCase):
@@ -34,6 +38,101 @@ class TestBetamaxAdapter(unittest.TestCase):
         assert self.adapter.cassette is not None
         assert self.adapter.cassette_name == filename
 
+    def test_load_cassette_with_re_record_scope(self):
+        self.adapter.load_cassette('GitHub_emojis', 'json', {
+            'record': 'none',
+            'cassette_library_dir': 'tests/cassettes/',
+            're_record_interval': 1,
+            're_record_scope': 'interaction',
+        })
+        assert self.adapter.cassette.interactions != []
+        assert self.adapter.cassette.re_record_before is not None
+
+    def test_counts_used_interactions(self):
+        self.adapter.load_cassette('GitHub_emojis', 'json', {
+            'record': 'none',
+            'cassette_library_dir': 'tests/cassettes/',
+        })
+        cassette = self.adapter.cassette
+        request = cassette.interactions[0].as_response().request
+        assert cassette.find_match(request) is not None
+        assert cassette.find_match(request) is not None
+        counts = self.adapter.stats.counts[cassette.cassette_path]
+        assert counts['loaded'] == 1
+        assert counts['used'] == 1
+
+    def test_failed_recording_keeps_vacated_interaction(self):
+        class FailingAdapter(BaseAdapter):
+            def send(self, request, **kwargs):
+                raise ConnectionError()
+
+        self.adapter = BetamaxAdapter(old_adapters={
+            'https://': FailingAdapter(),
+            })
+        self.adapter.load_cassette('GitHub_emojis', 'json', {
+            'record': 'none',
+            'cassette_library_dir': 'tests/cassettes/',
+        })
+        cassette = self.adapter.cassette
+        interaction = cassette.interactions[0]
+        request = interaction.as_response().request
+        cassette.record_mode = 'all'
+        self.assertRaises(ConnectionError, self.adapter.send, request)
+        assert cassette._vacated == []
+
+        cassette.record_mode = 'none'
+        assert cassette.find_match(request) is interaction
+        # Do not rewrite the cassette when ejecting it
+        self.adapter.cassette = None
+
+    def test_simulate_latency(self):
+        class Interaction(object):
+            duration = 0.05
+            time_to_first_byte = 0.01
+
+        def elapsed(stream=False):
+            start = time.time()
+            self.adapter.simulate_latency(Interaction(), stream)
+            return time.time() - start
+
+        assert elapsed() < 0.05
+        self.adapter.options['replay_latency'] = 2
+        assert elapsed() >= 0.1
+        assert elapsed(stream=True) < 0.05
+        self.adapter.options['max_replay_latency'] = 0.02
+        assert elapsed() < 0.05
+
+    def test_find_adapter(self):
+        default = HTTPAdapter()
+        custom = BaseAdapter()
+        adapter = BetamaxAdapter(old_adapters={
+            'https://': default, 'https://API.example.com/': custom,
+            })
+        assert adapter.find_adapter('https://example.com/') is default
+        assert adapter.find_adapter('https://api.example.com/a') is custom
+        assert adapter.find_adapter('ftp://example.com/') is (
+            adapter.http_adapter
+            )
+
+    def test_find_adapter_with_configured_pools(self):
+        custom = BaseAdapter()
+        adapter = BetamaxAdapter(pool_maxsize=20, old_adapters={
+            'https://': HTTPAdapter(), 'https://api.example.com/': custom,
+            })
+        assert adapter.http_adapter._pool_maxsize == 20
+        assert adapter.find_adapter('https://example.com/') is (
+            adapter.http_adapter
+            )
+        assert adapter.find_adapter('https://api.example.com/a') is custom
+
+    def test_restore_elapsed(self):
+        r = Response()
+        assert restore_elapsed(r) is r
+        assert r.elapsed == timedelta(0)
+        r.recorded_elapsed = timedelta(seconds=2)
+        restore_elapsed(r)
+        assert r.elapsed == timedelta(seconds=2)
+
 
 if __name__ == '__main__':
     sys.path.insert(0, os.path.abspath('../..'))
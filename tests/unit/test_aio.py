@@ -0,0 +1,52 @@
+import unittest
+
+import pytest
+from requests import Request
+
+asyncio = pytest.importorskip('asyncio')
+
+from betamax.aio import AsyncCassette  # noqa: E402
+
+
+class TestAsyncCassette(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.cassette = self.loop.run_until_complete(AsyncCassette.open(
+            'GitHub_emojis', cassette_library_dir='tests/cassettes',
+            record_mode='none', loop=self.loop
+            ))
+        self.request = Request(
+            'GET', 'https://api.github.com/emojis'
+            ).prepare()
+
+    def test_open(self):
+        assert self.cassette.loop is self.loop
+        assert len(self.cassette.cassette.interactions) == 1
+
+    def test_replay(self):
+        future = self.cassette.replay(self.request)
+        assert future.done()
+        response = self.loop.run_until_complete(future)
+        assert response.status_code == 200
+        assert '+1' in response.json()
+        assert self.cassette.cassette.stats.totals()['counts']['replay'] == 1
+
+    def test_replay_without_match(self):
+        request = Request('GET', 'https://api.github.com/users').prepare()
+        assert self.loop.run_until_complete(
+            self.cassette.replay(request)
+            ) is None
+
+    def test_find_match_and_as_response(self):
+        interaction = self.loop.run_until_complete(
+            self.cassette.find_match(self.request)
+            )
+        response = self.loop.run_until_complete(
+            self.cassette.as_response(interaction)
+            )
+        assert response.url == 'https://api.github.com/emojis'
+
+    def test_eject(self):
+        # Nothing is recorded, so nothing is written either
+        assert self.loop.run_until_complete(self.cassette.eject()) is None
@@ -1,7 +1,8 @@
-import email
+import base64
 import os
 import unittest
-from datetime import datetime
+import zlib
+from datetime import datetime, timedelta
 
 from betamax import __version__
 from betamax import cassette
@@ -117,6 +118,26 @@ class TestSerialization(unittest.TestCase):
         assert r.status_code == 200
         assert r.reason == 'OK'
 
+    def test_elapsed_round_trips(self):
+        r = Response()
+        r.status_code = 200
+        r.reason = 'OK'
+        r.encoding = 'utf-8'
+        r.headers = CaseInsensitiveDict()
+        r.url = 'http://example.com'
+        util.add_urllib3_response({
+            'body': {
+                'string': decode('foo'),
+                'encoding': 'utf-8'
+            }
+        }, r, HTTPHeaderDict())
+        assert 'elapsed' not in util.serialize_response(r, False)
+
+        r.elapsed = timedelta(seconds=1, microseconds=500000)
+        serialized = util.serialize_response(r, False)
+        assert serialized['elapsed'] == 1.5
+        assert util.deserialize_response(serialized).elapsed == r.elapsed
+
     def test_serialize_prepared_request(self):
         r = Request()
         r.method = 'GET'
@@ -153,6 +174,109 @@ class TestSerialization(unittest.TestCase):
         assert p.method == 'GET'
         assert p.url == 'http://example.com/'
 
+    def test_timestamp_round_trips(self):
+        when = datetime(2015, 4, 18, 12, 30, 15, 123456)
+        assert util.timestamp(when) == '2015-04-18T12:30:15.123456'
+        assert util.parse_timestamp(util.timestamp(when)) == when
+        assert util.parse_timestamp(util.timestamp()) is not None
+
+    def test_parse_timestamp_without_microseconds(self):
+        assert util.parse_timestamp('2013-08-31T00:00:01') == datetime(
+            2013, 8, 31, 0, 0, 1
+        )
+
+    def test_recorded_body_is_decoded_lazily(self):
+        body = util.RecordedBody({'string': 'foo', 'encoding': 'utf-8'})
+        assert body.body is None
+        assert body.read() == b'foo'
+        assert body.read(10) == b''
+
+        body = util.RecordedBody({'base64_string': 'Zm9vIGJhcgo=',
+                                  'encoding': 'utf-8'})
+        assert body.read(3) == b'foo'
+        assert body.read() == b' bar\n'
+
+    def test_recorded_body_preserves_chunks(self):
+        body = util.RecordedBody({'string': 'foobarbaz', 'encoding': 'utf-8',
+                                  'chunks': [2, 4, 3]})
+        assert body.read(10) == b'fo'
+        assert body.read(1) == b'o'
+        assert body.read(10) == b'bar'
+        assert body.read() == b'baz'
+        assert body.read(10) == b''
+
+        body = util.RecordedBody({'string': 'foobarbaz', 'encoding': 'utf-8',
+                                  'chunks': [2, 4, 3]})
+        assert body.read(1) == b'f'
+        assert body.read() == b'oobarbaz'
+
+    def test_decompress_body(self):
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        gzipped = compressor.compress(b'foo') + compressor.flush()
+        serialized = {
+            'body': {
+                'base64_string': base64.b64encode(gzipped).decode(),
+                'encoding': 'utf-8',
+            },
+            'headers': {'content-encoding': ['gzip']},
+        }
+        assert util.decompress_body(serialized) == b'foo'
+
+        serialized['headers']['content-encoding'] = ['deflate']
+        serialized['body']['base64_string'] = base64.b64encode(
+            zlib.compress(b'foo')
+        ).decode()
+        assert util.decompress_body(serialized) == b'foo'
+
+        serialized['body']['chunks'] = [1, 2]
+        assert util.decompress_body(serialized) == b'foo'
+
+        serialized['headers'] = {}
+        assert util.decompress_body(serialized) is None
+
+    def test_deserialize_response_with_decoded_body(self):
+        s = {
+            'body': {'base64_string': '', 'encoding': 'utf-8'},
+            'headers': {
+                'Content-Encoding': ['gzip'],
+                'Content-Length': ['23'],
+            },
+            'url': 'http://example.com/',
+            'status': {'code': 200, 'message': 'OK'},
+        }
+        r = util.deserialize_response(s, b'foo')
+        assert r.content == b'foo'
+        assert r.headers['Content-Encoding'] == 'gzip'
+        assert 'Content-Encoding' not in r.raw.headers
+
+    def test_sanitizer(self):
+        sanitizer = util.Sanitizer([
+            {'placeholder': '<TOKEN>', 'replace': 'abc'},
+            {'placeholder': '<LONG>', 'replace': 'abcdef'},
+            {'placeholder': '<EMPTY>', 'replace': ''},
+        ])
+        interaction = {
+            'request': {
+                'body': {'string': 'token=abc', 'encoding': 'utf-8'},
+                'headers': {'Authorization': ['token abcdef']},
+                'uri': 'http://example.com/?token=abc',
+            },
+            'response': {
+                'body': {'base64_string': 'abc', 'encoding': 'utf-8'},
+                'headers': {'X-Token': 'abc'},
+                'url': 'http://example.com/?token=abc',
+            },
+        }
+        sanitizer.sanitize_interaction(interaction)
+        request = interaction['request']
+        assert request['body']['string'] == 'token=<TOKEN>'
+        assert request['headers']['Authorization'] == ['token <LONG>']
+        assert request['uri'] == 'http://example.com/?token=<TOKEN>'
+        response = interaction['response']
+        assert response['body']['base64_string'] == 'abc'
+        assert response['headers']['X-Token'] == '<TOKEN>'
+        assert sanitizer.replacements == 5
+
     def test_from_list_returns_an_element(self):
         a = ['value']
         assert util.from_list(a) == 'value'
@@ -262,6 +386,15 @@ class TestCassette(unittest.TestCase):
         assert serialized['response'] == self.json['response']
         assert serialized.get('recorded_at') is not None
 
+    def test_serialize_interaction_with_start_time(self):
+        started_at = datetime(2015, 4, 18, 12, 30, 15, 123456)
+        serialized = self.cassette.serialize_interaction(
+            self.response, self.response.request, started_at
+        )
+        assert serialized['recorded_at'] == '2015-04-18T12:30:15.123456'
+        assert serialized['duration'] > 0
+        assert 'duration' not in self.interaction.json
+
     def test_holds_interactions(self):
         assert isinstance(self.cassette.interactions, list)
         assert self.cassette.interactions != []
@@ -273,6 +406,146 @@ class TestCassette(unittest.TestCase):
         assert i is not None
         assert self.interaction is i
 
+    def test_find_match_uses_index(self):
+        self.cassette.match_options = ['method', 'uri']
+        i = self.cassette.find_match(self.response.request)
+        assert i is self.interaction
+        index = self.cassette._indexes[('method', 'uri')]
+        assert sum(len(v) for v in index.values()) == 1
+
+        self.cassette.save_interaction(self.response, self.response.request)
+        assert sum(len(v) for v in index.values()) == 2
+        # The first recorded interaction still wins
+        i = self.cassette.find_match(self.response.request)
+        assert i is self.interaction
+
+    def test_find_match_records_stats(self):
+        self.cassette.match_options = ['method', 'uri']
+        self.cassette.find_match(self.response.request)
+        path = self.cassette.cassette_path
+        assert self.cassette.stats.counts[path]['match'] == 1
+        assert self.cassette.stats.counts[path]['candidates'] == 1
+        assert self.cassette.stats.durations[path]['match'] >= 0
+
+        self.cassette.match_options = ['method', 'digest-auth']
+        self.cassette.find_match(self.response.request)
+        assert self.cassette.stats.counts[path]['match'] == 2
+        assert self.cassette.stats.counts[path]['candidates'] == 2
+
+    def test_find_match_without_match(self):
+        self.cassette.match_options = ['method', 'uri']
+        request = self.response.request.copy()
+        request.url = 'http://example.com/other'
+        assert self.cassette.find_match(request) is None
+
+    def test_find_match_falls_back_for_unindexable_matchers(self):
+        self.cassette.match_options = ['method', 'digest-auth']
+        i = self.cassette.find_match(self.response.request)
+        assert i is self.interaction
+        assert self.cassette._indexes[('method', 'digest-auth')] is None
+
+    def test_find_match_vacates_matches_when_recording_all(self):
+        self.cassette.match_options = ['method', 'uri']
+        self.cassette.record_mode = 'all'
+        request = self.response.request
+        assert self.cassette.find_match(request) is None
+        assert self.cassette.find_match(request) is None
+        self.cassette.eject()
+        assert self.test_serializer.serialize_calls[-1]['http_interactions'] \
+            == []
+
+    def test_find_match_vacates_stale_interactions(self):
+        self.cassette.match_options = ['method', 'uri']
+        request = self.response.request
+        self.cassette.re_record_before = datetime(2000, 1, 1)
+        assert self.cassette.find_match(request) is self.interaction
+
+        self.cassette.re_record_before = datetime.max
+        assert self.cassette.find_match(request) is None
+        assert self.cassette.is_recording(request) is True
+        new = self.cassette.save_interaction(self.response, request)
+        assert self.cassette.interactions == [new]
+
+    def test_is_recording_once_only_records_vacated_requests(self):
+        self.cassette.match_options = ['method', 'uri']
+        # Pretend the cassette was not empty when loaded
+        self.cassette.serialized = {'http_interactions': [
+            self.interaction.json
+            ]}
+        request = self.response.request
+        other = request.copy()
+        other.url = 'http://example.com/other'
+        assert self.cassette.is_recording(request) is False
+
+        self.cassette.re_record_before = datetime.max
+        assert self.cassette.find_match(request) is None
+        assert self.cassette.find_match(other) is None
+        assert self.cassette.is_recording(request) is True
+        assert self.cassette.is_recording(other) is False
+        assert self.cassette.is_recording() is False
+
+    def test_save_interaction_replaces_vacated_interaction(self):
+        self.cassette.save_interaction(self.response, self.response.request)
+        self.cassette.match_options = ['method', 'digest-auth']
+        self.cassette.record_mode = 'all'
+        request = self.response.request
+        assert self.cassette.find_match(request) is None
+        new = self.cassette.save_interaction(self.response, request)
+        assert len(self.cassette.interactions) == 2
+        assert self.cassette.interactions[0] is new
+        assert self.interaction not in self.cassette.interactions
+
+    def test_save_interaction_replaces_each_vacated_interaction(self):
+        self.cassette.save_interaction(self.response, self.response.request)
+        second = self.cassette.interactions[1]
+        self.cassette.match_options = ['method', 'uri']
+        self.cassette.record_mode = 'all'
+        request = self.response.request
+        # Recording twice without saving in between vacates both
+        self.cassette._vacate(self.interaction, request)
+        self.cassette._vacate(second, request)
+        first = self.cassette.save_interaction(self.response, request)
+        last = self.cassette.save_interaction(self.response, request)
+        assert self.cassette.interactions == [first, last]
+        assert self.cassette._vacated == []
+
+    def test_cancel_recording(self):
+        self.cassette.match_options = ['method', 'uri']
+        request = self.response.request
+        other = request.copy()
+        self.cassette.re_record_before = datetime.max
+        assert self.cassette.find_match(request) is None
+        self.cassette.cancel_recording(other)
+        assert self.cassette._vacated != []
+
+        self.cassette.cancel_recording(request)
+        assert self.cassette._vacated == []
+        self.cassette.re_record_before = None
+        assert self.cassette.find_match(request) is self.interaction
+        # Another request is appended instead of replacing it
+        new = self.cassette.save_interaction(self.response, request)
+        assert self.cassette.interactions == [self.interaction, new]
+
+    def test_find_match_replays_matches_sequentially(self):
+        self.cassette.match_options = ['method', 'uri']
+        self.cassette.replay_order = 'sequential'
+        self.cassette.save_interaction(self.response, self.response.request)
+        second = self.cassette.interactions[1]
+        request = self.response.request
+        assert self.cassette.find_match(request) is self.interaction
+        assert self.cassette.find_match(request) is second
+        assert self.cassette.find_match(request) is second
+
+    def test_find_match_cycles_through_matches(self):
+        self.cassette.match_options = ['method', 'digest-auth']
+        self.cassette.replay_order = 'cycle'
+        self.cassette.save_interaction(self.response, self.response.request)
+        second = self.cassette.interactions[1]
+        request = self.response.request
+        assert self.cassette.find_match(request) is self.interaction
+        assert self.cassette.find_match(request) is second
+        assert self.cassette.find_match(request) is self.interaction
+
     def test_eject(self):
         serializer = self.test_serializer
         self.cassette.eject()
@@ -281,10 +554,71 @@ class TestCassette(unittest.TestCase):
              'recorded_with': 'betamax/{0}'.format(__version__)}
             ]
 
+    def test_prune(self):
+        self.cassette.match_options = ['method', 'uri']
+        request = self.response.request
+        self.cassette.save_interaction(self.response, request)
+        for i in self.cassette.interactions:
+            # Pretend the interactions were loaded from the cassette
+            i.orig_response = None
+
+        # Nothing was replayed, so nothing is dropped
+        assert self.cassette.prune() == 0
+        assert len(self.cassette.interactions) == 2
+
+        assert self.cassette.find_match(request) is self.interaction
+        assert self.cassette.prune() == 1
+        assert self.cassette.interactions == [self.interaction]
+        assert self.cassette.find_match(request) is self.interaction
+
+    def test_eject_prunes_unused_interactions(self):
+        serializer = self.test_serializer
+        self.cassette.prune_unused_interactions = True
+        self.cassette.match_options = ['method', 'uri']
+        self.interaction.orig_response = None
+        other = self.response.request.copy()
+        other.url = 'http://example.com/other'
+        recorded = self.cassette.save_interaction(self.response, other)
+
+        self.cassette.eject()
+        assert serializer.serialize_calls[-1]['http_interactions'] == [
+            recorded.json
+            ]
+
     def test_earliest_recorded_date(self):
         assert self.interaction.recorded_at is not None
         assert self.cassette.earliest_recorded_date is not None
 
+    def test_earliest_recorded_date_is_tracked(self):
+        earliest = self.cassette.earliest_recorded_date
+        i = self.cassette.save_interaction(self.response,
+                                           self.response.request)
+        assert earliest <= i.recorded_at
+        assert self.cassette.earliest_recorded_date == earliest
+
+        self.cassette.clear()
+        assert self.cassette._earliest_recorded_at is None
+
+    def test_replacing_the_earliest_interaction_does_not_scan(self):
+        class Unscannable(list):
+            def __iter__(self):
+                raise AssertionError('the interactions were scanned')
+
+        self.cassette.match_options = ['method', 'uri']
+        self.cassette.record_mode = 'all'
+        request = self.response.request
+        # As if self.interaction had been loaded
+        self.cassette._earliest_recorded_at = self.interaction.recorded_at
+        assert self.cassette.find_match(request) is None
+        self.cassette.interactions = Unscannable(self.cassette.interactions)
+        new = self.cassette.save_interaction(self.response, request)
+        self.cassette.interactions = list(
+            self.cassette.interactions[n]
+            for n in range(len(self.cassette.interactions))
+            )
+        assert self.cassette._earliest_recorded_at is cassette.cassette.STALE
+        assert self.cassette.earliest_recorded_date == new.recorded_at
+
 
 class TestInteraction(unittest.TestCase):
     def setUp(self):
@@ -326,6 +660,19 @@ class TestInteraction(unittest.TestCase):
         r = self.interaction.as_response()
         assert isinstance(r, Response)
 
+    def test_deserializes_lazily(self):
+        assert self.interaction.recorded_at == self.date
+        assert self.interaction.recorded_response is None
+        r = self.interaction.as_response()
+        assert self.interaction.recorded_response is r
+
+    def test_as_response_returns_new_responses(self):
+        r0 = self.interaction.as_response()
+        assert list(r0.iter_content(2)) == [b'fo', b'o']
+        r1 = self.interaction.as_response()
+        assert r1 is not r0
+        assert r1.content == b'foo'
+
     def test_deserialized_response(self):
         def check_uri(attr):
             # Necessary since PreparedRequests do not have a uri attr
@@ -357,6 +704,12 @@ class TestInteraction(unittest.TestCase):
         assert headers == actual_req.headers
         assert self.date == self.interaction.recorded_at
 
+    def test_deserialize_skips_cookies_when_none_are_set(self):
+        del self.response['headers']['Set-Cookie']
+        r = cassette.Interaction(self.json).as_response()
+        assert len(r.cookies) == 0
+        assert r.raw._original_response._msg is None
+
     def test_match(self):
         matchers = [lambda x: True, lambda x: False, lambda x: True]
         assert self.interaction.match(matchers) is False
@@ -416,5 +769,8 @@ class TestMockHTTPResponse(unittest.TestCase):
     def test_isclosed(self):
         assert self.resp.isclosed() is False
 
-    def test_is_Message(self):
-        assert isinstance(self.resp.msg, email.message.Message)
+    def test_msg_exposes_headers(self):
+        assert self.resp.msg.get_all('Header') == ['value']
+        assert self.resp.msg.get_all('Missing', []) == []
+        assert self.resp.msg.getheaders('header') == ['value']
+        assert self.resp.msg is self.resp.msg
@@ -0,0 +1,137 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from betamax import cli, serializers
+from betamax.cassette import Cassette
+
+
+class TestCLI(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with open('tests/cassettes/GitHub_emojis.json') as fd:
+            data = json.load(fd)
+        interaction = data['http_interactions'][0]
+        again = dict(interaction, recorded_at='2015-04-18T12:00:00')
+        data['http_interactions'] = [interaction, again]
+        os.mkdir(os.path.join(self.directory, 'sub'))
+        self.path = os.path.join(self.directory, 'sub', 'emojis.json')
+        with open(self.path, 'w') as fd:
+            json.dump(data, fd, indent=4)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        serializers.serializer_registry.pop('pretty-json', None)
+
+    def load(self, path=None):
+        with open(path or self.path) as fd:
+            return json.load(fd)
+
+    def test_find_cassettes(self):
+        open(os.path.join(self.directory, 'notes.txt'), 'w').close()
+        assert list(cli.find_cassettes([self.directory], 'json')) == [
+            self.path
+            ]
+
+    def test_stats(self):
+        stats = cli.cassette_stats(self.path, 'json')
+        assert stats['interactions'] == 2
+        assert stats['duplicates'] == 1
+        assert stats['oldest'] == '2013-12-31T01:04:59'
+        assert stats['newest'] == '2015-04-18T12:00:00'
+
+    def test_compact(self):
+        size = os.path.getsize(self.path)
+        assert cli.main(['-j', '1', 'compact', self.directory]) == 0
+        assert os.path.getsize(self.path) < size
+        assert len(self.load()['http_interactions']) == 2
+
+    def test_dedupe(self):
+        assert cli.main(['dedupe', self.path]) == 0
+        interactions = self.load()['http_interactions']
+        assert len(interactions) == 1
+        assert interactions[0]['recorded_at'] == '2013-12-31T01:04:59'
+
+        os.utime(self.path, (0, 0))
+        assert cli.main(['dedupe', self.path]) == 0
+        assert os.path.getmtime(self.path) == 0
+
+    def test_convert(self):
+        class PrettyJSONSerializer(serializers.JSONSerializer):
+            name = 'pretty-json'
+
+            @staticmethod
+            def generate_cassette_name(cassette_library_dir, cassette_name):
+                return os.path.join(cassette_library_dir,
+                                    cassette_name + '.pretty')
+
+            def serialize(self, cassette_data):
+                return json.dumps(cassette_data, indent=2)
+
+        serializers.serializer_registry['pretty-json'] = PrettyJSONSerializer()
+        assert cli.main(['convert', '--to', 'pretty-json', self.path]) == 0
+        converted = os.path.join(self.directory, 'sub', 'emojis.pretty')
+        assert self.load(converted) == self.load()
+
+    def test_sanitize(self):
+        placeholders = os.path.join(self.directory, 'placeholders.txt')
+        with open(placeholders, 'w') as fd:
+            json.dump([{'placeholder': '<API>', 'replace': 'api.github'}], fd)
+
+        assert cli.main(['sanitize', '-p', '<CLIENT>=github3.py',
+                         '--placeholders-file', placeholders,
+                         self.directory]) == 0
+        request = self.load()['http_interactions'][0]['request']
+        assert request['uri'] == 'https://<API>.com/emojis'
+        assert request['headers']['User-Agent'] == '<CLIENT>/0.8.0'
+
+    def test_sanitize_without_placeholders(self):
+        options = Cassette.default_cassette_options
+        configured = options['placeholders']
+        options['placeholders'] = []
+        try:
+            assert cli.main(['sanitize', self.path]) == 2
+        finally:
+            options['placeholders'] = configured
+
+    def test_lint(self):
+        assert cli.main(['lint', self.directory]) == 0
+        assert cli.main(['lint', '-p', '<CLIENT>=github3.py',
+                         self.directory]) == 1
+
+    def test_broken_cassettes_are_skipped(self):
+        broken = os.path.join(self.directory, 'broken.json')
+        with open(broken, 'w') as fd:
+            fd.write('{"http_interactions": [')
+        assert cli.main(['compact', self.directory]) == 0
+        assert cli.cassette_stats(broken, 'json')['error'].startswith(
+            'the cassette is truncated'
+            )
+        assert cli.main(['lint', self.directory]) == 1
+
+    def test_invalid_and_missing_cassettes_are_reported(self):
+        invalid = os.path.join(self.directory, 'invalid.json')
+        with open(invalid, 'w') as fd:
+            json.dump({'http_interactions': [{'request': {},
+                                              'response': {}}]}, fd)
+        missing = os.path.join(self.directory, 'missing.json')
+
+        stats = cli.cassette_stats(invalid, 'json')
+        assert stats['interactions'] == 0
+        assert stats['error'] == (
+            'interaction 0: recorded_at is missing or not a string'
+            )
+        stats = cli.cassette_stats(missing, 'json')
+        assert stats['size'] == 0
+        assert stats['error'].startswith('the cassette cannot be read')
+
+        for command in ('stats', 'dedupe'):
+            assert cli.main(['-j', '2', command, self.directory,
+                             missing]) == 0
+        assert 'error' in cli.rewrite(missing, 'json', cli.identity)
+        assert cli.main(['lint', missing]) == 1
+
+    def test_unknown_serializer(self):
+        assert cli.main(['convert', '--to', 'bogus', self.path]) == 2
@@ -22,6 +22,12 @@ class TestMatchers(unittest.TestCase):
     def test_matcher_registry_has_digest_auth_matcher(self):
         assert 'digest-auth' in matchers.matcher_registry
 
+    def test_matcher_registry_has_form_body_matcher(self):
+        assert 'form-body' in matchers.matcher_registry
+
+    def test_matcher_registry_has_json_body_matcher(self):
+        assert 'json-body' in matchers.matcher_registry
+
     def test_matcher_registry_has_headers_matcher(self):
         assert 'headers' in matchers.matcher_registry
 
@@ -72,6 +78,91 @@ class TestMatchers(unittest.TestCase):
             'method': 'GET',
         })
 
+    def test_json_body_matcher(self):
+        match = matchers.matcher_registry['json-body'].match
+        self.p.body = b'{"a": 1, "b": [1, 2], "c": {"d": null, "e": "f"}}'
+        assert match(self.p, {
+            'body': {'string': '{"c":{"e":"f","d":null},"b":[1,2],"a":1}',
+                     'encoding': 'utf-8'},
+            'headers': {},
+            'method': 'GET',
+            'uri': 'http://example.com/',
+        })
+        assert match(self.p, {
+            'body': {'string': '{"a": 1, "b": [2, 1]}', 'encoding': 'utf-8'},
+            'headers': {},
+            'method': 'GET',
+            'uri': 'http://example.com/',
+        }) is False
+
+    def test_json_body_matcher_handles_invalid_json(self):
+        match = matchers.matcher_registry['json-body'].match
+        recorded = {'body': 'Foo bar', 'headers': {}, 'method': 'GET',
+                    'uri': 'http://example.com/'}
+        assert match(self.p, recorded)
+        recorded['body'] = 'Foo baz'
+        assert match(self.p, recorded) is False
+
+    def test_form_body_matcher(self):
+        match = matchers.matcher_registry['form-body'].match
+        self.p.body = 'b=2&a=1&c=hello+world&d='
+        assert match(self.p, {
+            'body': {'string': 'd=&c=hello%20world&a=1&b=2',
+                     'encoding': 'utf-8'},
+            'headers': {},
+            'method': 'GET',
+            'uri': 'http://example.com/',
+        })
+        assert match(self.p, {
+            'body': {'string': 'a=1&b=3', 'encoding': 'utf-8'},
+            'headers': {},
+            'method': 'GET',
+            'uri': 'http://example.com/',
+        }) is False
+
+    def test_keys_agree_with_match(self):
+        other = self.p.copy()
+        other.url = self.alt_url
+        for name in ('method', 'host', 'path', 'query', 'uri', 'body',
+                     'json-body', 'form-body', 'headers'):
+            matcher = matchers.matcher_registry[name]
+            assert matcher.key(self.p) == matcher.key(self.p.copy())
+            assert hash(matcher.key(self.p)) is not None
+        uri = matchers.matcher_registry['uri']
+        assert uri.key(self.p) != uri.key(other)
+        self.p.url = ('http://example.com/path/to/end/point?foo=bar'
+                      '&query=string')
+        assert uri.key(self.p) == uri.key(other)
+
+    def test_body_keys_of_streamed_bodies(self):
+        self.p.body = (chunk for chunk in [b'{"a": 1}'])
+        for name in ('json-body', 'form-body'):
+            matcher = matchers.matcher_registry[name]
+            assert matcher.key(self.p) is None
+            assert matcher.match(self.p, {
+                'body': {'string': '{"a": 1}', 'encoding': 'utf-8'},
+                'headers': {},
+                'method': 'GET',
+                'uri': 'http://example.com/',
+            }) is False
+
+    def test_only_keys_written_for_match_are_indexed(self):
+        class LooseURIMatcher(matchers.URIMatcher):
+            name = 'loose-uri'
+
+            def match(self, request, recorded_request):
+                return True
+
+        class ExactURIMatcher(LooseURIMatcher):
+            name = 'exact-uri'
+
+            def key(self, request):
+                return request.url
+
+        assert matchers.matcher_registry['uri'].indexable()
+        assert LooseURIMatcher().indexable() is False
+        assert ExactURIMatcher().indexable()
+
     def test_digest_matcher(self):
         match = matchers.matcher_registry['digest-auth'].match
         assert match(self.p, {'headers': {}})
@@ -98,6 +189,35 @@ class TestMatchers(unittest.TestCase):
         assert match(self.p, {'headers': {'User-Agent': 'betamax/test'}})
         assert match(self.p, {'headers': {'X-Sha': '6bbde0af'}}) is False
 
+    def test_headers_matcher_ignores_name_case(self):
+        match = matchers.matcher_registry['headers'].match
+        assert match(self.p, {'headers': {'user-agent': ['betamax/test']}})
+        assert match(self.p, {'headers': {'user-agent': 'other'}}) is False
+
+    def test_headers_matcher_include_and_exclude(self):
+        class ExcludingMatcher(matchers.HeadersMatcher):
+            name = 'excluding-headers'
+            exclude = ['user-agent', 'Date']
+
+        class IncludingMatcher(matchers.HeadersMatcher):
+            name = 'including-headers'
+            include = ['Accept']
+
+        self.p.headers['Accept'] = 'application/json'
+        self.p.headers['Date'] = 'Sat, 18 Apr 2015 00:00:00 GMT'
+        recorded = {'headers': {'Accept': ['application/json'],
+                                'User-Agent': ['betamax/other']}}
+
+        assert matchers.HeadersMatcher().match(self.p, recorded) is False
+        assert ExcludingMatcher().match(self.p, recorded)
+        assert IncludingMatcher().match(self.p, recorded)
+        assert IncludingMatcher().key(self.p) == frozenset([
+            ('accept', 'application/json')
+        ])
+        recorded['headers']['Accept'] = ['text/html']
+        assert ExcludingMatcher().match(self.p, recorded) is False
+        assert IncludingMatcher().match(self.p, recorded) is False
+
     def test_host_matcher(self):
         match = matchers.matcher_registry['host'].match
         assert match(self.p, {'uri': 'http://example.com'})
@@ -169,3 +289,8 @@ class TestBaseMatcher(unittest.TestCase):
         self.Matcher.name = 'test'
         m = self.Matcher()
         self.assertRaises(NotImplementedError, m.match, None, None)
+
+    def test_key_is_optional(self):
+        self.Matcher.name = 'test'
+        m = self.Matcher()
+        assert m.key(None) is None
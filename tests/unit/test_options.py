@@ -1,6 +1,8 @@
 import unittest
 from itertools import permutations
-from betamax.options import Options, validate_record, validate_matchers
+from betamax.cassette import Cassette
+from betamax.options import (Options, validate_record, validate_matchers,
+                             validate_re_record_scope, validate_replay_order)
 
 
 class TestValidators(unittest.TestCase):
@@ -8,6 +10,16 @@ class TestValidators(unittest.TestCase):
         for mode in ['once', 'none', 'all', 'new_episodes']:
             assert validate_record(mode) is True
 
+    def test_validate_re_record_scope(self):
+        for scope in ['cassette', 'interaction']:
+            assert validate_re_record_scope(scope) is True
+        assert validate_re_record_scope('session') is False
+
+    def test_validate_replay_order(self):
+        for order in ['first', 'sequential', 'cycle']:
+            assert validate_replay_order(order) is True
+        assert validate_replay_order('random') is False
+
     def test_validate_matchers(self):
         matchers = ['method', 'uri', 'query', 'host', 'body']
         for i in range(1, len(matchers)):
@@ -41,6 +53,30 @@ class TestOptions(unittest.TestCase):
 
         assert 'fake' not in options
 
+    def test_prune_unused_interactions_is_validated(self):
+        options = Options({'prune_unused_interactions': 'yes'})
+        assert 'prune_unused_interactions' not in options
+        options = Options({'prune_unused_interactions': True})
+        assert options['prune_unused_interactions'] is True
+
+    def test_validate_interactions_is_validated(self):
+        options = Options({'validate_interactions': 'yes'})
+        assert 'validate_interactions' not in options
+        options = Options({'validate_interactions': True})
+        assert options['validate_interactions'] is True
+
+    def test_defaults_follow_the_configuration(self):
+        options = Options({})
+        defaults = Cassette.default_cassette_options
+        record_mode = defaults['record_mode']
+        defaults['record_mode'] = 'none'
+        try:
+            assert options['record'] == 'none'
+        finally:
+            defaults['record_mode'] = record_mode
+        assert options['record'] == record_mode
+        assert options['serialize_with'] == 'json'
+
     def test_values_are_validated(self):
         assert self.options['re_record_interval'] == 10000
         assert self.options['match_requests_on'] == ['method']
@@ -34,6 +34,13 @@ class TestBetamax(unittest.TestCase):
         self.vcr.use_cassette('test')
         assert isinstance(self.vcr.current_cassette, Cassette)
 
+    def test_stats(self):
+        assert self.vcr.stats is self.vcr.betamax_adapter.stats
+        self.vcr.use_cassette('test')
+        assert self.vcr.current_cassette.stats is self.vcr.stats
+        path = self.vcr.current_cassette.cassette_path
+        assert self.vcr.stats.counts[path]['load'] == 1
+
     def test_use_cassette_returns_cassette_object(self):
         assert self.vcr.use_cassette('test') is self.vcr
 
@@ -55,6 +62,28 @@ class TestBetamax(unittest.TestCase):
         assert isinstance(serializers.serializer_registry['fake_serializer'],
                           FakeSerializer)
 
+    def test_adapter_kwargs(self):
+        vcr = Betamax(self.session, adapter_kwargs={'pool_maxsize': 20})
+        assert vcr.betamax_adapter.http_adapter._pool_maxsize == 20
+        assert vcr.betamax_adapter.record_with_http_adapter is True
+
+    def test_close(self):
+        closed = []
+        self.vcr.betamax_adapter.close = lambda: closed.append(True)
+        with self.vcr:
+            pass
+        assert closed == []
+        self.vcr.close()
+        assert closed == [True]
+
+    def test_session_close_closes_the_adapters(self):
+        other = Betamax(self.session)
+        closed = []
+        for vcr in (self.vcr, other):
+            vcr.betamax_adapter.close = lambda: closed.append(True)
+        self.session.close()
+        assert closed == [True, True]
+
     def test_stores_the_session_instance(self):
         assert self.session is self.vcr.session
 
@@ -0,0 +1,86 @@
+import json
+import os
+import unittest
+
+from betamax.report import UsageReport
+from betamax.stats import Stats
+
+
+class TestUsageReport(unittest.TestCase):
+    cassette_path = os.path.join('tests', 'cassettes', 'GitHub_emojis.json')
+
+    def setUp(self):
+        self.report = UsageReport()
+        self.report.start()
+
+    def tearDown(self):
+        self.report.stop()
+
+    def record_events(self):
+        stats = Stats()
+        self.report.current_test = 'test_one'
+        stats.record('load', self.cassette_path, duration=0.5)
+        stats.record('loaded', self.cassette_path, count=3)
+        stats.record_use(self.cassette_path, 0)
+        stats.record('replay', self.cassette_path, count=2)
+        stats.record('upstream', self.cassette_path, duration=10.0)
+        self.report.current_test = 'test_two'
+        stats.record('miss', 'other.json')
+        stats.record('save', 'other.json', duration=1.0)
+
+    def test_collects_events_of_every_stats_object(self):
+        self.record_events()
+        self.report.stop()
+        Stats().record('load', 'ignored.json')
+        assert set(self.report.counts) == set([self.cassette_path,
+                                               'other.json'])
+
+    def test_cassettes(self):
+        self.record_events()
+        (other, emojis) = self.report.cassettes()
+        assert emojis == {
+            'cassette': self.cassette_path,
+            'size': os.path.getsize(self.cassette_path),
+            'tests': ['test_one'],
+            'interactions': 3,
+            'used': 1,
+            'replays': 2,
+            'misses': 0,
+            'records': 0,
+            'pruned': 0,
+            'load_time': 0.5,
+            'match_time': 0.0,
+            'save_time': 0.0,
+            'time': 0.5,
+        }
+        assert other['size'] is None
+        assert other['misses'] == 1
+        assert other['time'] == 1.0
+
+    def test_counts_each_interaction_used_once(self):
+        for position in (0, 0, 2):
+            # Each test loads the cassette again
+            stats = Stats()
+            stats.record('loaded', self.cassette_path, count=3)
+            stats.record_use(self.cassette_path, position)
+        (emojis,) = self.report.cassettes()
+        assert emojis['interactions'] == 3
+        assert emojis['used'] == 2
+        assert UsageReport.sort_keys['unused'](emojis) == 1
+
+    def test_stop(self):
+        self.report.stop()
+        assert self.report not in Stats.global_hooks
+        assert self.report.interaction_used not in Stats.global_use_hooks
+
+    def test_to_json(self):
+        self.record_events()
+        data = json.loads(self.report.to_json())
+        assert len(data['cassettes']) == 2
+
+    def test_format_table(self):
+        self.record_events()
+        lines = self.report.format_table(sort='unused').splitlines()
+        assert len(lines) == 3
+        assert lines[1].endswith(os.path.relpath(self.cassette_path))
+        assert len(self.report.format_table(top=1).splitlines()) == 2
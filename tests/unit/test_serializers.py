@@ -1,7 +1,8 @@
 import pytest
 import unittest
 
-from betamax.serializers import BaseSerializer, JSONSerializer
+from betamax.serializers import (BaseSerializer, JSONSerializer,
+                                 SerializerProxy, serializer_registry)
 
 
 class TestJSONSerializer(unittest.TestCase):
@@ -14,6 +15,13 @@ class TestJSONSerializer(unittest.TestCase):
                 JSONSerializer.generate_cassette_name(self.cassette_dir,
                                                       self.cassette_name))
 
+    def test_deserialize_blank_cassette(self):
+        assert JSONSerializer().deserialize('  \n') == {}
+
+    def test_deserialize_invalid_cassette(self):
+        with pytest.raises(ValueError):
+            JSONSerializer().deserialize('{"http_interactions": [')
+
     def test_generate_cassette_name_with_instance(self):
         serializer = JSONSerializer()
         assert ('fake_dir/cassette_name.json' ==
@@ -39,3 +47,30 @@ class TestBaseSerializer(unittest.TestCase):
     def test_requires_a_name(self):
         with pytest.raises(ValueError):
             BaseSerializer()
+
+
+class TestSerializerProxy(unittest.TestCase):
+    def tearDown(self):
+        serializer_registry.pop('test', None)
+
+    def test_locate(self):
+        (serializer, path) = SerializerProxy.locate('json', 'fake_dir',
+                                                    'cassette_name')
+        assert serializer is serializer_registry['json']
+        assert path == 'fake_dir/cassette_name.json'
+        assert SerializerProxy.locate('bogus', 'fake_dir', 'name') == (
+            None, None
+            )
+
+    def test_locate_notices_new_serializers(self):
+        class TestSerializer(Serializer):
+            @staticmethod
+            def generate_cassette_name(cassette_library_dir, cassette_name):
+                return cassette_name + '.test'
+
+        serializer_registry['test'] = JSONSerializer()
+        SerializerProxy.locate('test', 'fake_dir', 'name')
+        serializer_registry['test'] = TestSerializer()
+        assert SerializerProxy.locate('test', 'fake_dir', 'name')[1] == (
+            'name.test'
+            )
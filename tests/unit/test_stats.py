@@ -0,0 +1,56 @@
+import unittest
+
+from betamax.stats import Stats
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        self.stats = Stats()
+
+    def test_record(self):
+        self.stats.record('match', 'a.json', duration=0.5)
+        self.stats.record('match', 'a.json', duration=0.25)
+        self.stats.record('candidates', 'a.json', count=3)
+        assert self.stats.counts == {'a.json': {'match': 2, 'candidates': 3}}
+        assert self.stats.durations == {'a.json': {'match': 0.75}}
+
+    def test_timer(self):
+        with self.stats.timer('load', 'a.json'):
+            pass
+        assert self.stats.counts['a.json']['load'] == 1
+        assert self.stats.durations['a.json']['load'] >= 0
+
+    def test_hooks(self):
+        events = []
+        self.stats.hooks.append(lambda *args: events.append(args))
+        self.stats.record('miss', 'a.json')
+        self.stats.record('save', 'a.json', duration=1.0)
+        assert events == [('miss', 'a.json', 1, None),
+                          ('save', 'a.json', 1, 1.0)]
+
+    def test_record_use(self):
+        positions = []
+        Stats.global_use_hooks.append(lambda *args: positions.append(args))
+        try:
+            self.stats.record_use('a.json', 2)
+        finally:
+            Stats.global_use_hooks.pop()
+        assert self.stats.counts == {'a.json': {'used': 1}}
+        assert positions == [('a.json', 2)]
+
+    def test_totals(self):
+        self.stats.record('match', 'a.json', duration=1.0)
+        self.stats.record('match', 'b.json', duration=2.0)
+        self.stats.record('miss', 'b.json')
+        assert self.stats.totals() == {
+            'counts': {'match': 2, 'miss': 1},
+            'durations': {'match': 3.0},
+        }
+        assert set(self.stats.as_dict()['cassettes']) == set(['a.json',
+                                                             'b.json'])
+
+    def test_reset(self):
+        self.stats.record('match', 'a.json', duration=1.0)
+        self.stats.reset()
+        assert self.stats.counts == {}
+        assert self.stats.durations == {}
@@ -0,0 +1,108 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import pytest
+
+from betamax.cassette import Cassette, validation
+from betamax.exceptions import InvalidCassette
+from betamax.serializers import JSONSerializer
+
+
+class TestValidation(unittest.TestCase):
+    def setUp(self):
+        with open('tests/cassettes/GitHub_emojis.json') as fd:
+            self.text = fd.read()
+        self.data = json.loads(self.text)
+        self.serializer = JSONSerializer()
+
+    def test_check_structure(self):
+        assert validation.check_structure(self.data) == []
+
+        interaction = self.data['http_interactions'][0]
+        del interaction['request']['method']
+        interaction['response']['status'] = {'code': '200'}
+        interaction['recorded_at'] = 'yesterday'
+        assert validation.check_structure(self.data) == [
+            'interaction 0: recorded_at is not a valid timestamp',
+            'interaction 0: request.method is missing or not a string',
+            'interaction 0: response.status.code is not an integer',
+            ]
+
+    def test_check_structure_without_interactions(self):
+        assert validation.check_structure([]) == [
+            'the cassette is not a mapping'
+            ]
+        assert validation.check_structure({'recorded_with': 'betamax'}) == [
+            'http_interactions is missing or not a list'
+            ]
+
+    def test_lint(self):
+        assert validation.lint(self.text, self.serializer) == []
+        assert validation.lint('', self.serializer) == []
+
+    def test_lint_truncated_cassette(self):
+        problems = validation.lint(self.text[:100], self.serializer)
+        assert len(problems) == 1
+        assert problems[0].startswith('the cassette is truncated')
+
+    def test_lint_duplicate_keys(self):
+        text = self.text.replace('"method":', '"uri": "x", "method":', 1)
+        assert validation.lint(text, self.serializer) == [
+            "duplicate key 'uri'"
+            ]
+
+    def test_lint_skips_duplicate_keys_without_object_pairs_hook(self):
+        class Python26JSON(object):
+            @staticmethod
+            def loads(text, **kwargs):
+                if 'object_pairs_hook' in kwargs:
+                    raise TypeError('unexpected keyword argument')
+                return json.loads(text, **kwargs)
+
+        text = self.text.replace('"method":', '"uri": "x", "method":', 1)
+        validation.json = Python26JSON
+        try:
+            assert validation.lint(text, self.serializer) == []
+        finally:
+            validation.json = json
+
+    def test_lint_secrets(self):
+        placeholders = [{'placeholder': '<CLIENT>', 'replace': 'github3.py'}]
+        assert validation.lint(self.text, self.serializer, placeholders) == [
+            'unsanitized value of <CLIENT>'
+            ]
+
+
+class TestValidateInteractions(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'broken.json')
+        self.options = {'cassette_library_dir': self.directory,
+                        'record_mode': 'none'}
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, content):
+        with open(self.path, 'w') as fd:
+            fd.write(content)
+
+    def test_invalid_structure(self):
+        self.write(json.dumps({'http_interactions': [{'request': {}}]}))
+        with pytest.raises(InvalidCassette) as excinfo:
+            Cassette('broken', 'json', validate_interactions=True,
+                     **self.options)
+        assert excinfo.value.cassette_path == self.path
+        assert ('interaction 0: response is missing or not a mapping' in
+                excinfo.value.problems)
+
+    def test_unreadable_cassette(self):
+        self.write('{"http_interactions": [')
+        with pytest.raises(InvalidCassette) as excinfo:
+            Cassette('broken', 'json', **self.options)
+        assert excinfo.value.problems[0].startswith(
+            'the cassette is truncated'
+            )